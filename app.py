@@ -13,28 +13,43 @@ jishaku.Flags.NO_UNDERSCORE = True
 jishaku.Flags.NO_DM_TRACEBACK = True
 jishaku.Flags.HIDE = True
 
-discord.utils.setup_logging(root=True)
-
-LOGGER = logging.getLogger()
-LOGGER.setLevel(logging.INFO)
-logging.getLogger("discord.http").setLevel(logging.WARNING)
-
-handler = RotatingFileHandler(
-    filename="gobu.log",
-    encoding="utf-8",
-    maxBytes=32 * 1024 * 1024,
-    backupCount=5
-)
-
-formatter = logging.Formatter(
-    "[{asctime}] [{levelname:<8}] {name}: {message}",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    style="{"
-)
-handler.setFormatter(formatter)
-LOGGER.addHandler(handler)
-
-with open("config.toml", "rb") as f:
-    config = tomllib.load(f)
-
-Gobu().run(config["bot"]["token"], log_handler=None)
+
+def main():
+    discord.utils.setup_logging(root=True)
+
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    logging.getLogger("discord.http").setLevel(logging.WARNING)
+
+    handler = RotatingFileHandler(
+        filename="gobu.log",
+        encoding="utf-8",
+        maxBytes=32 * 1024 * 1024,
+        backupCount=5
+    )
+
+    formatter = logging.Formatter(
+        "[{asctime}] [{levelname:<8}] {name}: {message}",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        style="{"
+    )
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+    with open("config.toml", "rb") as f:
+        config = tomllib.load(f)
+
+    metrics_config = config.get("metrics", {})
+    bot = Gobu(
+        interactions_only=config["bot"].get("interactions_only", False),
+        metrics_port=metrics_config.get("port"),
+        metrics_textfile=metrics_config.get("textfile"),
+        stall_threshold=config.get("watchdog", {}).get("threshold", 0.25),
+    )
+    bot.run(config["bot"]["token"], log_handler=None)
+
+
+# the planner's worker processes import this as __mp_main__, they shouldnt
+# log to gobu.log or start a second bot
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""pushes simulated gateway traffic through a real Gobu without a network.
+
+a fake gateway feeds MESSAGE_CREATE/INTERACTION_CREATE payloads straight
+into the client's connection state (the same parsers the websocket uses),
+and a fake REST layer answers everything discord.py sends back, both
+through the normal HTTPClient and the webhook adapter that interaction
+responses go through. so on_message, process_commands, the converters,
+Navi and the persistent button dispatch all run for real.
+
+each simulated user keeps one request in flight: it sends a command, waits
+for the reply, sometimes flips a page on it, and in between sends chatter
+that isnt for us (most of what a real gateway delivers). latency is from
+handing the payload to the client until the first REST call it caused.
+
+run from the repo root with: python -m benchmarks.loadtest [--users 50 --duration 10]
+"""
+
+import argparse
+import asyncio
+import contextvars
+import itertools
+import json
+import logging
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Any
+
+import discord
+from discord.http import HTTPClient, Route
+from discord.webhook.async_ import AsyncWebhookAdapter, async_context
+
+from core.bot import PREFIX, Gobu
+from core.navi import NEXT_LABEL
+
+BOT_ID = 1000
+APPLICATION_ID = 1000
+GUILD_ID = 2000
+CHANNEL_ID = 3000
+TIMESTAMP = "2024-01-01T00:00:00+00:00"
+
+# how long a request can go without a reply before it counts as dropped
+TIMEOUT = 10.0
+# how often the loop lag is sampled, in seconds
+LAG_INTERVAL = 0.005
+
+SNOWFLAKES = itertools.count(10**17)
+
+BOT_USER = {"id": str(BOT_ID), "username": "gobu", "discriminator": "0000", "avatar": None, "bot": True}
+
+
+def user_payload(user_id: int) -> dict[str, Any]:
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0000", "avatar": None}
+
+
+def member_payload(user_id: int) -> dict[str, Any]:
+    return {"user": user_payload(user_id), "roles": [], "joined_at": TIMESTAMP, "deaf": False, "mute": False, "flags": 0}
+
+
+GUILD = {
+    "id": str(GUILD_ID),
+    "name": "load test",
+    "owner_id": "1",
+    "icon": None,
+    "features": [],
+    "roles": [{
+        "id": str(GUILD_ID),
+        "name": "@everyone",
+        "permissions": str(discord.Permissions.all().value),
+        "position": 0,
+        "color": 0,
+        "hoist": False,
+        "managed": False,
+        "mentionable": False,
+    }],
+    "channels": [{
+        "id": str(CHANNEL_ID),
+        "type": 0,
+        "name": "load",
+        "position": 0,
+        "permission_overwrites": [],
+        "guild_id": str(GUILD_ID),
+    }],
+    "members": [member_payload(BOT_ID) | {"user": BOT_USER}],
+    "emojis": [],
+    "stickers": [],
+    "member_count": 2,
+}
+
+
+class Request:
+    __slots__ = ("kind", "started", "reply")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.reply: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+
+    def answer(self, message: dict[str, Any]):
+        if not self.reply.done():
+            self.reply.set_result(message)
+
+
+# the request whose handling is running right now. every event handler is
+# its own task, and tasks copy the context they were made in, so whatever
+# the fake REST layer gets called from can tell which request caused it
+CURRENT: contextvars.ContextVar[Request | None] = contextvars.ContextVar("CURRENT", default=None)
+
+
+def message_payload(channel_id: int, body: dict[str, Any] | None, *, message_id: int | None = None) -> dict[str, Any]:
+    body = body or {}
+    return {
+        "id": str(message_id or next(SNOWFLAKES)),
+        "channel_id": str(channel_id),
+        "guild_id": str(GUILD_ID),
+        "author": BOT_USER,
+        "content": body.get("content") or "",
+        "embeds": body.get("embeds") or [],
+        "components": body.get("components") or [],
+        "attachments": [],
+        "mentions": [],
+        "mention_roles": [],
+        "mention_everyone": False,
+        "pinned": False,
+        "tts": False,
+        "timestamp": TIMESTAMP,
+        "edited_timestamp": None,
+        "flags": body.get("flags") or 0,
+        "type": 0,
+    }
+
+
+class FakeREST:
+    """answers every route with something that looks like discord's reply."""
+
+    def __init__(self):
+        self.calls = 0
+        # interaction token -> the message its response created
+        self.originals: dict[str, dict[str, Any]] = {}
+
+    def respond(self, route: Route, body: dict[str, Any] | None) -> Any:
+        self.calls += 1
+        request = CURRENT.get()
+        path = route.path
+
+        if path == "/channels/{channel_id}/messages" and route.method == "POST":
+            message = message_payload(int(route.channel_id or CHANNEL_ID), body)
+        elif path == "/interactions/{webhook_id}/{webhook_token}/callback":
+            assert body is not None
+            data = body.get("data")
+            message = message_payload(CHANNEL_ID, data)
+            if data is not None:
+                self.originals[str(route.webhook_token)] = message
+            if request is not None:
+                request.answer(message)
+            return None
+        elif path.startswith("/webhooks/{webhook_id}/{webhook_token}/messages/"):
+            message = self.originals.get(str(route.webhook_token)) or message_payload(CHANNEL_ID, body)
+            if route.method == "PATCH":
+                message = message | message_payload(CHANNEL_ID, body, message_id=int(message["id"]))
+            elif route.method == "DELETE":
+                return None
+        elif path.startswith("/webhooks/{webhook_id}/{webhook_token}"):
+            message = message_payload(CHANNEL_ID, body)
+        else:
+            # typing, reactions, deletes and whatever else, nobody reads these
+            return None
+
+        if request is not None:
+            request.answer(message)
+        return message
+
+
+class FakeHTTP(HTTPClient):
+    def __init__(self, loop: asyncio.AbstractEventLoop, rest: FakeREST):
+        super().__init__(loop)
+        self.rest = rest
+
+    async def request(self, route: Route, *, files: Any = None, form: Any = None, **kwargs: Any) -> Any:
+        return self.rest.respond(route, kwargs.get("json"))
+
+
+class FakeWebhookAdapter(AsyncWebhookAdapter):
+    def __init__(self, rest: FakeREST):
+        super().__init__()
+        self.rest = rest
+
+    async def request(self, route: Route, session: Any, *, payload: Any = None, multipart: Any = None,
+                      **kwargs: Any) -> Any:
+        if payload is None and multipart:
+            payload = json.loads(multipart[0]["value"])
+        return self.rest.respond(route, payload)
+
+
+class Gateway:
+    """hands payloads to the client the same way the websocket does."""
+
+    def __init__(self, bot: Gobu):
+        self.state = bot._connection
+
+    def feed(self, event: str, data: dict[str, Any], request: Request | None):
+        token = CURRENT.set(request)
+        try:
+            self.state.parsers[event](data)
+        finally:
+            CURRENT.reset(token)
+
+    def message(self, user_id: int, content: str, request: Request | None):
+        self.feed("MESSAGE_CREATE", {
+            **message_payload(CHANNEL_ID, {"content": content}),
+            "author": user_payload(user_id),
+            # message members come without their user, it's the author
+            "member": {key: value for key, value in member_payload(user_id).items() if key != "user"},
+        }, request)
+
+    def click(self, user_id: int, message: dict[str, Any], custom_id: str, request: Request):
+        interaction_id = next(SNOWFLAKES)
+        self.feed("INTERACTION_CREATE", {
+            "id": str(interaction_id),
+            "application_id": str(APPLICATION_ID),
+            "type": 3,
+            "token": f"token-{interaction_id}",
+            "version": 1,
+            "guild_id": str(GUILD_ID),
+            "channel_id": str(CHANNEL_ID),
+            "member": member_payload(user_id) | {"permissions": str(discord.Permissions.all().value)},
+            "message": message,
+            "data": {"custom_id": custom_id, "component_type": 2},
+            "locale": "en-US",
+            "guild_locale": "en-US",
+            "app_permissions": str(discord.Permissions.all().value),
+        }, request)
+
+
+async def start() -> tuple[Gobu, Gateway, FakeREST]:
+    rest = FakeREST()
+    async_context.set(FakeWebhookAdapter(rest))
+
+    bot = Gobu()
+    # what login() would do, minus actually logging in
+    await bot._async_setup_hook()
+    bot.http = bot._connection.http = FakeHTTP(asyncio.get_running_loop(), rest)
+    bot._connection.user = discord.ClientUser(state=bot._connection, data=BOT_USER)  # type: ignore
+    bot._connection.application_id = APPLICATION_ID
+    await bot.setup_hook()
+    bot._connection._add_guild_from_data(GUILD)  # type: ignore
+    return (bot, Gateway(bot), rest)
+
+
+def commands_to_send(rng: random.Random) -> list[str]:
+    # imported late since the dataset only exists once the cog is loaded
+    from cogs.pets.static import DATASET, SCHOOLS
+
+    ds = DATASET.current
+    pets = rng.sample(ds.pets, min(100, len(ds.pets)))
+    words = sorted({word for pet in pets for word in pet.lower_name.split()})
+    parents = [ds.pets_by_internal_name[name] for name in ds.partners_by_parent] or ds.pets
+    talents = sorted(rng.sample(ds.talents, min(40, len(ds.talents))), key=lambda t: t.priority)
+
+    sent: list[str] = []
+    for _ in range(200):
+        (a, b) = rng.sample(pets, 2)
+        (below, above) = sorted(rng.sample(talents, 2), key=lambda t: t.priority)
+        sent.extend([
+            f"{PREFIX}pets {rng.choice(words)}",
+            f"{PREFIX}pets {rng.choice(words)} school: {rng.choice(sorted(SCHOOLS))}",
+            f"{PREFIX}hatch {a.name}, {b.name}",
+            f"{PREFIX}hybrids {rng.choice(parents).name}",
+            f"{PREFIX}talents below: {below.internal_name} above: {above.internal_name}",
+            f"<@{BOT_ID}> pets {rng.choice(words)}",
+        ])
+    return sent
+
+
+def next_button(message: dict[str, Any]) -> str | None:
+    for row in message.get("components") or ():
+        for component in row.get("components", ()):
+            if component.get("label") == NEXT_LABEL and not component.get("disabled"):
+                return component.get("custom_id")
+    return None
+
+
+class LoadTest:
+    def __init__(self, gateway: Gateway, commands: list[str], args: argparse.Namespace):
+        self.gateway = gateway
+        self.commands = commands
+        self.args = args
+        self.latencies: dict[str, list[float]] = {"command": [], "click": []}
+        self.chatter = 0
+        self.dropped = 0
+        self.lag: list[float] = []
+        self.running = True
+
+    async def request(self, kind: str, send) -> dict[str, Any] | None:
+        request = Request(kind)
+        send(request)
+        try:
+            reply = await asyncio.wait_for(asyncio.shield(request.reply), TIMEOUT)
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            return None
+        self.latencies[kind].append(time.perf_counter() - request.started)
+        return reply
+
+    async def user(self, user_id: int, rng: random.Random):
+        gateway = self.gateway
+        while self.running:
+            for _ in range(self.args.chatter):
+                gateway.message(user_id, f"just chatting {rng.random()}", None)
+                self.chatter += 1
+            # let the chatter handlers run before the next request
+            await asyncio.sleep(0)
+
+            content = rng.choice(self.commands)
+            reply = await self.request("command", lambda r: gateway.message(user_id, content, r))
+            while reply is not None and rng.random() < self.args.clicks and (custom_id := next_button(reply)):
+                message = reply
+                reply = await self.request("click", lambda r: gateway.click(user_id, message, custom_id, r))
+
+    async def measure_lag(self):
+        loop = asyncio.get_running_loop()
+        while self.running:
+            start = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.lag.append(loop.time() - start - LAG_INTERVAL)
+
+    async def run(self) -> float:
+        lag = asyncio.create_task(self.measure_lag())
+        users = [
+            asyncio.create_task(self.user(10_000 + n, random.Random(self.args.seed + n)))
+            for n in range(self.args.users)
+        ]
+        start = time.perf_counter()
+        await asyncio.sleep(self.args.duration)
+        self.running = False
+        elapsed = time.perf_counter() - start
+        await asyncio.gather(*users, lag, return_exceptions=True)
+        return elapsed
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": statistics.median(ordered) * 1e3,
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e3,
+        "max_ms": ordered[-1] * 1e3,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50, help="simulated users, each with one request in flight")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run for")
+    parser.add_argument("--chatter", type=int, default=10, help="messages that arent for us per command")
+    parser.add_argument("--clicks", type=float, default=0.5, help="chance of flipping a page after each reply")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="also write the results here as json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    (bot, gateway, rest) = await start()
+    test = LoadTest(gateway, commands_to_send(random.Random(args.seed)), args)
+    elapsed = await test.run()
+
+    handled = sum(len(samples) for samples in test.latencies.values())
+    results = {
+        "users": args.users,
+        "seconds": elapsed,
+        "events_per_second": (handled + test.chatter) / elapsed,
+        "requests_per_second": handled / elapsed,
+        "chatter": test.chatter,
+        "dropped": test.dropped,
+        "rest_calls": rest.calls,
+        "messages_accepted": bot.messages_accepted,
+        "messages_rejected": bot.messages_rejected,
+        "latency": {kind: percentiles(samples) | {"count": len(samples)} for kind, samples in test.latencies.items()},
+        "loop_lag": percentiles(test.lag),
+    }
+
+    print(f"{args.users} users for {elapsed:.1f}s: {results['events_per_second']:.0f} events/s,"
+          f" {results['requests_per_second']:.0f} requests/s, {test.dropped} dropped")
+    for kind, stats in results["latency"].items():
+        if stats["count"]:
+            print(f"  {kind:<8} {stats['count']:>7}  p50 {stats['p50_ms']:.2f}ms  p99 {stats['p99_ms']:.2f}ms")
+    if test.lag:
+        lag = results["loop_lag"]
+        print(f"  loop lag          p50 {lag['p50_ms']:.2f}ms  p99 {lag['p99_ms']:.2f}ms  max {lag['max_ms']:.2f}ms")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    await bot.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,194 @@
+"""benchmarks the pets cog end to end minus discord: building the dataset
+(and its snapshot), the converters, the pets/talents/hatch/hybrids/matrix
+logic and rendering their first page, on synthetic datasets scaled up from
+the real one (see synthetic.py).
+
+results go to a json file so runs on different commits can be compared.
+
+run from the repo root with: python -m benchmarks.pets [--scales 1 10 100 1000]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import pickle
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from cogs.pets import cog
+from cogs.pets.dataset import Dataset
+from cogs.pets.types import PetData, TalentData
+
+from . import synthetic
+
+SCALES = (1, 10, 100)
+# how many different inputs each query gets run with
+QUERIES = 200
+RESULTS = Path("benchmarks/results")
+
+
+class Context:
+    """the bits of commands.Context the converters and cog touch."""
+
+    def __init__(self, ds: Dataset):
+        self.pets_dataset = ds
+        self.command = None
+        self.current_parameter = None
+        self.current_argument = ""
+
+
+def timings(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "median_us": statistics.median(ordered) * 1e6,
+        "p99_us": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6,
+        "total_ms": sum(ordered) * 1e3,
+    }
+
+
+async def measure(inputs: list[Any], run: Callable[[Any], Awaitable[Any] | Any]) -> dict[str, float]:
+    samples: list[float] = []
+    for argument in inputs:
+        start = time.perf_counter()
+        try:
+            result = run(argument)
+            if asyncio.iscoroutine(result):
+                await result
+        except cog.PetCogException:
+            # "nothing found" is as much of an answer as anything else
+            pass
+        samples.append(time.perf_counter() - start)
+    return timings(samples)
+
+
+def build(pets: list[PetData], talents: list[TalentData]) -> tuple[Dataset, dict[str, float]]:
+    start = time.perf_counter()
+    ds = Dataset(pets, talents)
+    built = time.perf_counter() - start
+
+    payload = pickle.dumps(ds, protocol=pickle.HIGHEST_PROTOCOL)
+    start = time.perf_counter()
+    pickle.loads(payload)
+    unpickled = time.perf_counter() - start
+
+    # traced separately since tracing slows the build down a lot
+    tracemalloc.start()
+    traced = Dataset(pets, talents)
+    (retained, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+
+    return (ds, {
+        "build_ms": built * 1e3,
+        "snapshot_load_ms": unpickled * 1e3,
+        "snapshot_bytes": len(payload),
+        "retained_mb": retained / 2**20,
+        "peak_mb": peak / 2**20,
+    })
+
+
+async def queries(ds: Dataset, rng: random.Random) -> dict[str, dict[str, float]]:
+    pets_cog = cog.PetsCog(None)  # type: ignore
+    ctx: Any = Context(ds)
+
+    names = [pet.name for pet in rng.sample(ds.pets, min(QUERIES, len(ds.pets)))]
+    words = sorted({word for name in names for word in name.lower().split()})
+    typos = [name[:-1] + "q" if len(name) > 4 else name for name in names]
+    schools = sorted(cog.SCHOOLS)
+    flagged = [
+        f"{rng.choice(words)} school: {rng.choice(schools)} wow-factor: {rng.randint(0, 10)}"
+        for _ in range(QUERIES)
+    ]
+    ranges = [
+        f"below: {a.internal_name} above: {b.internal_name}"
+        for a, b in (sorted(rng.sample(ds.talents, 2), key=lambda t: t.priority) for _ in range(QUERIES))
+    ]
+    pairs = [rng.sample(ds.pets, 2) for _ in range(QUERIES)]
+    parents = [ds.pets_by_internal_name[name] for name in ds.partners_by_parent] or ds.pets
+    parents = rng.sample(parents, min(QUERIES, len(parents)))
+
+    async def pets(query: str):
+        pair = await cog.SubstringPetsAndSearchFlags().convert(ctx, query)
+        cog.pet_pages(pets_cog.search_pets(ctx, pair)).render(0)
+
+    async def talents_between(query: str):
+        flags = await cog.TalentSearchFlags().convert(ctx, query)
+        (found, _) = pets_cog.search_talents(ctx, flags)
+        cog.talent_pages(found, format=flags.format).render(0)
+
+    return {
+        "convert PetConverter": await measure(names, lambda q: cog.PetConverter().convert(ctx, q)),
+        "convert PetConverter (typo)": await measure(typos, lambda q: cog.PetConverter().convert(ctx, q)),
+        "convert DelimitedPets": await measure(
+            [", ".join(names[i : i + 3]) for i in range(len(names))],
+            lambda q: cog.DelimitedPets().convert(ctx, q),
+        ),
+        "convert SubstringPetsAndSearchFlags": await measure(
+            flagged, lambda q: cog.SubstringPetsAndSearchFlags().convert(ctx, q)
+        ),
+        "pets": await measure(flagged, pets),
+        "pets (name only)": await measure(words, pets),
+        "talents": await measure(ranges, talents_between),
+        "hatch": await measure(pairs, lambda pair: pets_cog.hatch_pages(ctx, pair)),
+        "hybrids": await measure(parents, lambda pet: pets_cog.hybrid_pages(ctx, pet)),
+        "hatch matrix": await measure(parents, lambda pet: pets_cog.matrix_pages(ctx, pet, None)),
+    }
+
+
+def commit() -> str | None:
+    try:
+        found = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return found.stdout.strip()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help=f"defaults to a new file in {RESULTS}")
+    args = parser.parse_args()
+
+    (real_pets, talents) = synthetic.real()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    report: dict[str, Any] = {
+        "commit": commit(),
+        "date": now.isoformat(),
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "scales": {},
+    }
+
+    for factor in args.scales:
+        rng = random.Random(args.seed)
+        pets = synthetic.scale(real_pets, factor, seed=args.seed)
+        (ds, stats) = build(pets, talents)
+        stats = {"pets": len(ds.pets), "talents": len(ds.talents), **stats}
+        stats["queries"] = await queries(ds, rng)
+        report["scales"][str(factor)] = stats
+
+        print(f"x{factor}: {len(ds.pets)} pets, built in {stats['build_ms']:.0f}ms,"
+              f" snapshot {stats['snapshot_bytes'] / 2**20:.1f}MB loads in {stats['snapshot_load_ms']:.0f}ms,"
+              f" peak {stats['peak_mb']:.0f}MB")
+        for name, timing in stats["queries"].items():
+            print(f"  {name:<36} median {timing['median_us']:>10.1f}us  p99 {timing['p99_us']:>10.1f}us")
+
+    output = args.output
+    if output is None:
+        RESULTS.mkdir(parents=True, exist_ok=True)
+        output = RESULTS / f"{now:%Y%m%d-%H%M%S}-{(report['commit'] or 'unknown')[:8]}.json"
+    output.write_text(json.dumps(report, indent=2))
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""compares the trigram index behind SubstringPets against a linear scan.
+
+run from the repo root with: python -m benchmarks.substring
+"""
+
+import random
+import timeit
+
+from cogs.pets.search import TrigramIndex
+from cogs.pets.types import PetData
+
+from . import synthetic
+
+SCALES = (1, 10, 100)
+QUERIES = 200
+
+
+def scaled_names(pets: list[PetData], scale: int) -> dict[str, int]:
+    # the same made-up pets the other benchmarks run on, see synthetic.scale
+    names = (pet["name"].lower() for pet in synthetic.scale(pets, scale))
+    return {name: i for i, name in enumerate(names)}
+
+
+def queries(names: list[str], rng: random.Random) -> list[str]:
+    picked: list[str] = []
+    for name in rng.sample(names, min(QUERIES, len(names))):
+        size = rng.randint(3, min(8, len(name))) if len(name) >= 3 else len(name)
+        start = rng.randint(0, len(name) - size)
+        picked.append(name[start : start + size])
+    return picked
+
+
+def linear(entries: dict[str, int], substring: str) -> list[int]:
+    return [value for name, value in entries.items() if substring in name]
+
+
+def main():
+    rng = random.Random(0)
+    (pets, _) = synthetic.real()
+    print(f"{'scale':>5} {'pets':>8} {'build (ms)':>11} {'linear (us)':>12} {'trigram (us)':>13} {'speedup':>8}")
+
+    for scale in SCALES:
+        entries = scaled_names(pets, scale)
+        build = timeit.timeit(lambda: TrigramIndex(entries), number=1)
+        index = TrigramIndex(entries)
+        picked = queries(list(entries), rng)
+
+        for q in picked:
+            assert index.search(q) == linear(entries, q), q
+
+        scan = timeit.timeit(lambda: [linear(entries, q) for q in picked], number=3)
+        indexed = timeit.timeit(lambda: [index.search(q) for q in picked], number=3)
+        (scan, indexed) = (scan / (3 * len(picked)) * 1e6, indexed / (3 * len(picked)) * 1e6)
+
+        print(
+            f"{scale:>5} {len(entries):>8} {build * 1e3:>11.2f} {scan:>12.1f} {indexed:>13.1f}"
+            f" {scan / indexed:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""bigger versions of the real pets dataset for benchmarking.
+
+every pet is copied factor times. copy 0 is the real pet, the others get a
+made-up name out of the real names' words (so name searches behave about
+the same) and their morphing exceptions point at the same copy of the
+other parent and baby, so every copy has the same hybrid structure as the
+real thing. talents are left as-is since pools refer to them by name.
+"""
+
+import json
+import random
+
+from cogs.pets import snapshot
+from cogs.pets.types import PetData, TalentData
+
+
+def real() -> tuple[list[PetData], list[TalentData]]:
+    pets = json.loads(snapshot.PETS_PATH.read_bytes()).get("pets", [])
+    talents = json.loads(snapshot.TALENTS_PATH.read_bytes())
+    return (pets, talents)
+
+
+def copy_name(internal_name: str, copy: int) -> str:
+    return internal_name if copy == 0 else f"{internal_name}~{copy}"
+
+
+def scale(pets: list[PetData], factor: int, *, seed: int = 0) -> list[PetData]:
+    rng = random.Random(seed)
+    words = sorted({word for pet in pets for word in pet["name"].split()})
+    taken = {pet["name"].lower() for pet in pets}
+
+    scaled: list[PetData] = list(pets)
+    for copy in range(1, factor):
+        for pet in pets:
+            name = " ".join(rng.sample(words, min(len(words), rng.randint(1, 3))))
+            while name.lower() in taken:
+                name = f"{name} {rng.choice(words)}"
+            taken.add(name.lower())
+
+            scaled.append({
+                **pet,
+                "name": name,
+                "internal_name": copy_name(pet["internal_name"], copy),
+                "morphing_exceptions": [
+                    {"other": copy_name(m["other"], copy), "baby": copy_name(m["baby"], copy)}
+                    for m in pet["morphing_exceptions"]
+                ],
+            })
+
+    return scaled
@@ -1,7 +1,9 @@
 import core
 
-from .cog import PetsCog
-
 
 async def setup(bot: core.Gobu):
+    # imported here so that importing the package (eg. to build the
+    # snapshot with python -m cogs.pets.snapshot) doesnt load the dataset
+    from .cog import PetsCog
+
     await bot.add_cog(PetsCog(bot))
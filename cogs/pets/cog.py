@@ -1,72 +1,122 @@
+import asyncio
 import enum
+import functools
 import logging
-from typing import Annotated, List
+import multiprocessing
+import re
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import (Annotated, Any, Callable, Iterable, List, Literal,
+                    Sequence, TypeVar)
 
 import discord
-from discord import ui
-from discord.ext import commands
+from discord import app_commands, ui
+from discord.ext import commands, tasks
+from discord.ext.commands.view import StringView
 from discord.utils import MISSING
 from typing_extensions import Self
 
 import core
-from core import navi, utils
+from core import metrics, navi, utils
+from core.cache import TTLCache
 
+from . import manifest, planner, snapshot
+from .dataset import Dataset, PriorityIndex, pet_hatch_chance, set_bits
 from .static import *
 from .types import *
 
 LOGGER = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# how often each pet, talent and egg was asked for since startup, so
+# autocomplete can put the popular ones first
+POPULAR_PETS: Counter[str] = Counter()
+POPULAR_TALENTS: Counter[str] = Counter()
+POPULAR_EGGS: Counter[str] = Counter()
+
 def escape(content: str, *, width: int = 45, suffix: str = " [...]") -> str:
     escaped = discord.utils.escape_markdown(content)
     if len(escaped) > width:
         escaped = escaped[: width - len(suffix)] + suffix
     return escaped
 
-def pet_name_to_url(name: str) -> str:
-    # doesnt work for all pets
-    # for example some hybrid-type pets are suffixed with _(Hybrid)
-    # i cant do anything about this since i have no idea when the wiki does it
-    base = "https://www.wizard101central.com/wiki/Pet:"
-    return base + "_".join(name.split())
-
-def talent_name_to_url(name: str) -> str:
-    # likewise
-    base = "https://www.wizard101central.com/wiki/PetAbility:"
-    return base + "_".join(name.split())
-
 def delimited(string: str, *, delimiter: str = ","):
     for line in string.strip(delimiter).splitlines():
         for word in line.split(delimiter):
             if cleaned := word.strip():
                 yield cleaned
 
+def flag_query(*words: str | None, **flags: Any) -> str:
+    """the text a prefix command would get for some slash command options,
+    eg. flag_query("rain", wow_factor=10) -> "rain wow-factor: 10". lists
+    repeat the flag and bools become yes/no."""
+
+    parts = [word for word in words if word]
+    for name, value in flags.items():
+        if value is None:
+            continue
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, bool):
+                item = "yes" if item else "no"
+            parts.append(f"{name.replace('_', '-')}: {item}")
+    return " ".join(parts)
+
+def dataset(ctx: commands.Context) -> Dataset:
+    # the first converter to run pins the current dataset onto the context,
+    # so a reload landing halfway through a command cant mix two versions
+    try:
+        return ctx.pets_dataset  # type: ignore
+    except AttributeError:
+        ctx.pets_dataset = ds = DATASET.current  # type: ignore
+        return ds
+
+def count_use(ctx: commands.Context, popular: Counter[str], key: str):
+    # flipping a persistent page runs the converters again (see
+    # rebuild_pages), that's not someone asking for it again
+    if not getattr(ctx, "pets_rebuilding", False):
+        popular[key] += 1
+
 class BlankPaginator(commands.Paginator):
     def __init__(self):
         super().__init__(prefix=None, suffix=None)
 
 
 class PetConverter(commands.Converter):
+    @metrics.timed("convert")
     async def convert(self, ctx: commands.Context, argument: str) -> Pet:
+        pet = self.lookup(dataset(ctx), argument)
+        count_use(ctx, POPULAR_PETS, pet.internal_name)
+        return pet
+
+    @staticmethod
+    def lookup(ds: Dataset, argument: str) -> Pet:
         # looking up a pet by internal name is case-sensitive
-        if argument in PETS_BY_INTERNAL_NAME:
-            return PETS_BY_INTERNAL_NAME[argument]
+        if argument in ds.pets_by_internal_name:
+            return ds.pets_by_internal_name[argument]
 
         lower = argument.lower()
-        if lower in PETS_BY_LOWERCASE_NAME:
-            return PETS_BY_LOWERCASE_NAME[lower]
+        if lower in ds.pets_by_lowercase_name:
+            return ds.pets_by_lowercase_name[lower]
 
-        raise PetNotFound(argument)
+        # a single typo away from exactly one pet is close enough
+        if pet := ds.pets_by_fuzzy_name.closest(lower):
+            return pet
+
+        suggestions = [pet.name for _, pet in ds.pets_by_fuzzy_name.search(lower, limit=3)]
+        raise PetNotFound(argument, suggestions=suggestions)
 
 
 class SubstringPets(commands.Converter):
+    @metrics.timed("convert")
     async def convert(self, ctx: commands.Context, argument: str) -> list[Pet]:
+        ds = dataset(ctx)
         lower = argument.lower()
-        pets: list[Pet] = []
-        for name, pet in PETS_BY_LOWERCASE_NAME.items():
-            if lower in name:
-                pets.append(pet)
+        pets = ds.pets_by_name_trigrams.search(lower)
         if not pets:
-            raise NoPetsFound(argument)
+            suggestions = [pet.name for _, pet in ds.pets_by_fuzzy_name.search(lower, limit=3)]
+            raise NoPetsFound(argument, suggestions=suggestions)
         return pets
 
 
@@ -75,6 +125,7 @@ class DelimitedPets(PetConverter):
         self.bound = bound
         self.skip_duplicate = skip_duplicate
 
+    @metrics.timed("convert")
     async def convert(self, ctx: commands.Context, argument: str) -> list[Pet]:
         by_comma = [x for x in delimited(argument)]
         if self.bound is not None and len(by_comma) != self.bound:
@@ -87,7 +138,7 @@ class DelimitedPets(PetConverter):
         for pet_name in by_comma:
             pet = await super().convert(ctx, pet_name)
             if self.skip_duplicate:
-                internal_name = pet["internal_name"]
+                internal_name = pet.internal_name
                 if internal_name in seen:
                     continue
                 seen.add(internal_name)
@@ -97,21 +148,49 @@ class DelimitedPets(PetConverter):
 
 
 class TalentConverter(commands.Converter):
+    @metrics.timed("convert")
     async def convert(self, ctx: commands.Context, argument: str) -> Talent:
-        if argument in TALENTS_BY_INTERNAL_NAME:
-            return TALENTS_BY_INTERNAL_NAME[argument]
+        talent = self.lookup(dataset(ctx), argument)
+        count_use(ctx, POPULAR_TALENTS, talent.internal_name)
+        return talent
+
+    @staticmethod
+    def lookup(ds: Dataset, argument: str) -> Talent:
+        if argument in ds.talents_by_internal_name:
+            return ds.talents_by_internal_name[argument]
 
         lower = argument.lower()
-        if lower in TALENTS_BY_LOWERCASE_NAME:
-            return TALENTS_BY_LOWERCASE_NAME[lower]
+        if lower in ds.talents_by_lowercase_name:
+            return ds.talents_by_lowercase_name[lower]
+
+        if talent := ds.talents_by_fuzzy_name.closest(lower):
+            return talent
+
+        suggestions = [talent.name for _, talent in ds.talents_by_fuzzy_name.search(lower, limit=3)]
+        raise TalentNotFound(argument, suggestions=suggestions)
+
+    @staticmethod
+    def argument(ds: Dataset, talent: Talent) -> str:
+        """something lookup turns back into talent that doesnt have a comma
+        in it, since talents are usually given as a comma separated list.
+        eg. no pain, no gain -> no pain no gain."""
 
-        raise TalentNotFound(argument)
+        name = talent.name.replace(",", "")
+        candidates = [name]
+        if talent.unlocked is not None:
+            # the bare name is the locked one
+            candidates.append(f"{name} ({'unlocked' if talent.unlocked else 'locked'})")
+        for candidate in candidates:
+            if ds.talents_by_lowercase_name.get(candidate.lower()) is talent:
+                return candidate
+        return talent.internal_name
 
 
 class DelimitedTalents(TalentConverter):
     def __init__(self, *, bound: int | None = None):
         self.bound = bound
 
+    @metrics.timed("convert")
     async def convert(self, ctx: commands.Context, argument: str) -> list[Talent]:
         by_comma = [x for x in delimited(argument)]
         if self.bound is not None and len(by_comma) != self.bound:
@@ -124,7 +203,7 @@ class DelimitedTalents(TalentConverter):
         for talent_name in by_comma:
             talent = await super().convert(ctx, talent_name)
 
-            internal_name = talent["internal_name"]
+            internal_name = talent.internal_name
             if internal_name not in seen:
                 seen.add(internal_name)
 
@@ -133,12 +212,36 @@ class DelimitedTalents(TalentConverter):
         return talents
 
 
+class WeightedTalents(TalentConverter):
+    # eg. "mighty x3" wants mighty 3 times as much as a talent without one
+    WEIGHT = re.compile(r"\s+[x*]\s*(\d+(?:\.\d+)?)$", re.IGNORECASE)
+
+    @metrics.timed("convert")
+    async def convert(self, ctx: commands.Context, argument: str) -> dict[Talent, float]:
+        wishlist: dict[Talent, float] = {}
+        for item in delimited(argument):
+            weight = 1.0
+            if match := self.WEIGHT.search(item):
+                weight = float(match.group(1))
+                item = item[: match.start()]
+            if not 0 < weight <= RECOMMEND_MAX_WEIGHT:
+                raise BadTalentWeight(item)
+
+            talent = await super().convert(ctx, item)
+            wishlist[talent] = wishlist.get(talent, 0.0) + weight
+
+        if not wishlist:
+            raise NotEnoughTalents(bound=1)
+        return wishlist
+
+
 class RarityConverter(commands.Converter):
     # add some aliases
     RARITIES_ALIASED = RARITIES.copy()
     RARITIES_ALIASED["ultrarare"] = RARITIES_ALIASED["ultra rare"] = ULTRA_RARE
     RARITIES_ALIASED.update({v.lower(): k for k, v in SHORT_RARITIES.items()})
 
+    @metrics.timed("convert")
     async def convert(self, ctx: commands.Context, argument: str) -> int:
         lower = argument.lower()
         if lower not in self.RARITIES_ALIASED:
@@ -147,21 +250,39 @@ class RarityConverter(commands.Converter):
 
 
 class SchoolConverter(commands.Converter):
+    @metrics.timed("convert")
     async def convert(self, ctx: commands.Context, argument: str) -> str:
         lower = argument.lower()
-        if lower not in SCHOOLS:
-            raise SchoolNotFound(argument)
-        return lower
+        if lower in SCHOOLS:
+            return lower
+
+        if school := SCHOOLS_BY_FUZZY_NAME.closest(lower):
+            return school
+
+        raise SchoolNotFound(argument)
 
 
 class EggConverter(commands.Converter):
+    @metrics.timed("convert")
     async def convert(self, ctx: commands.Context, argument: str) -> str:
+        egg = self.lookup(dataset(ctx), argument)
+        count_use(ctx, POPULAR_EGGS, egg)
+        return egg
+
+    @staticmethod
+    def lookup(ds: Dataset, argument: str) -> str:
         lower = argument.lower()
         if not lower.endswith(" egg"):
             lower = f"{lower} egg"
-        if lower not in EGGS:
-            raise EggNotFound(argument)
-        return lower
+        if lower in ds.eggs:
+            return lower
+
+        lower = lower.removesuffix(" egg")
+        if egg := ds.eggs_by_fuzzy_name.closest(lower):
+            return egg
+
+        suggestions = [egg for _, egg in ds.eggs_by_fuzzy_name.search(lower, limit=3)]
+        raise EggNotFound(argument, suggestions=suggestions)
 
 
 class PriorityType(enum.Enum):
@@ -169,6 +290,7 @@ class PriorityType(enum.Enum):
     absolute = 2
 
     @classmethod
+    @metrics.timed("convert")
     async def convert(cls, ctx: commands.Context, argument: str) -> Self:
         lower = argument.lower()
         if lower in ("rel", "relative"):
@@ -178,6 +300,11 @@ class PriorityType(enum.Enum):
 
         raise BadPriorityStyle
 
+    def index(self, ds: Dataset) -> PriorityIndex:
+        if self is PriorityType.absolute:
+            return ds.talents_by_absolute_priority
+        return ds.talents_by_priority
+
 
 class BaseFlags(commands.FlagConverter):
     # rip
@@ -234,11 +361,67 @@ class PetSearchFlags(BaseFlags):
                                         default=None,
                                         description="whether the pet is a hybrid")
 
+    def canonical(self) -> tuple:
+        """the same search no matter how it was typed. every flag is and-ed
+        together so flag order and repeated values dont matter."""
+
+        return (
+            self.wow_factor,
+            self.rarity,
+            self.school,
+            self.egg,
+            self.exclusive,
+            self.tradeable,
+            self.hybrid,
+            frozenset(talent.internal_name for talent in self.talent),
+            frozenset(spell.lower() for spell in self.spell),
+        )
+
+    def resolve(self, ds: Dataset, bits: int) -> int:
+        """narrows down a bitset of pets to the ones matching every flag."""
+
+        for index, key in (
+            (ds.pet_bits_by_wow_factor, self.wow_factor),
+            (ds.pet_bits_by_rarity, self.rarity),
+            (ds.pet_bits_by_school, self.school),
+            (ds.pet_bits_by_egg, self.egg),
+        ):
+            if key is not None:
+                bits &= index.get(key, 0)
+
+        for subset, wanted in (
+            (ds.exclusive_pets, self.exclusive),
+            (ds.tradeable_pets, self.tradeable),
+            (ds.hybrid_pets, self.hybrid),
+        ):
+            if wanted is not None:
+                bits &= subset if wanted else ~subset
+
+        for talent in self.talent:
+            if not bits:
+                return 0
+            bits &= ds.pet_bits_by_talent.get(talent.lower_name, 0)
+
+        for spell in self.spell:
+            if not bits:
+                return 0
+            # spells are matched by substring so or together every spell
+            # containing it. theres way less unique spells than pets anyway
+            lower = spell.lower()
+            matching = 0
+            for name, spell_bits in ds.pet_bits_by_spell.items():
+                if lower in name:
+                    matching |= spell_bits
+            bits &= matching
+
+        return bits
+
 
 class SubstringPetsAndSearchFlags(commands.Converter):
     # help command has to "unwrap" the original flag converter one way or another
     FlagConverter = PetSearchFlags
 
+    @metrics.timed("convert")
     async def convert(self, ctx: commands.Context, argument: str):
         pattern = self.FlagConverter.__commands_flag_regex__
         match = pattern.search(argument)
@@ -250,11 +433,32 @@ class SubstringPetsAndSearchFlags(commands.Converter):
         before = argument[:offset].strip()
         after = argument[offset:].strip()
 
-        pets = await SubstringPets().convert(ctx, before) if before else PETS
+        pets = await SubstringPets().convert(ctx, before) if before else dataset(ctx).pets
         flags = await self.FlagConverter().convert(ctx, after)
         return (pets, flags)
 
 
+class PetAndSearchFlags(commands.Converter):
+    # see SubstringPetsAndSearchFlags
+    FlagConverter = PetSearchFlags
+
+    @metrics.timed("convert")
+    async def convert(self, ctx: commands.Context, argument: str):
+        pattern = self.FlagConverter.__commands_flag_regex__
+        match = pattern.search(argument)
+        if not match:
+            return (await PetConverter().convert(ctx, argument), None)
+
+        offset = match.start()
+        before = argument[:offset].strip()
+        if not before:
+            raise NotEnoughPets(bound=1)
+
+        pet = await PetConverter().convert(ctx, before)
+        flags = await self.FlagConverter().convert(ctx, argument[offset:].strip())
+        return (pet, flags)
+
+
 class TalentSearchFlags(BaseFlags):
     above: Talent | None = commands.flag(converter=TalentConverter,
                                          default=None,
@@ -284,6 +488,154 @@ class TalentSearchFlags(BaseFlags):
     format: PriorityType = commands.flag(default=PriorityType.relative,
                                          description='relative or absolute')
 
+    def canonical(self, ctx: commands.Context) -> tuple:
+        """see PetSearchFlags.canonical. between is the same search as
+        below + above once it's sorted by priority, so it's folded into
+        those (unless it was mixed with them, which is an error anyway)."""
+
+        (below, above) = (self.below, self.above)
+        if self.between and not (below or above):
+            (below, above) = sorted(self.between, key=self.format.index(dataset(ctx)).priority)
+
+        def name(talent: Talent | None) -> str | None:
+            return None if talent is None else talent.internal_name
+
+        return (
+            self.empty(ctx),
+            name(below),
+            name(above),
+            bool(self.between and (self.below or self.above)),
+            frozenset(self.rarity),
+            self.unlockable is not False,
+            self.format,
+        )
+
+
+# hatch takes up to this many pets and works out every pair of them
+HATCH_MAX_PETS = 6
+# hatch matrix shows this many of the best partners
+HATCH_MATRIX_SIZE = 30
+
+# plan searches run in this many worker processes, with this many waiting
+# or running at once, and give up after PLAN_TIME_BUDGET seconds
+PLAN_WORKERS = 2
+PLAN_SLOTS = 8
+PLAN_TIME_BUDGET = 10.0
+PLAN_MAX_TALENTS = 6
+PLAN_MAX_HATCHES = 4
+# not forked, the bot has the loop, to_thread workers and the watchdog
+# running and a fork can inherit one of their locks held. the dataset is
+# sent over pickled instead. the cancel flags come from here too so they
+# share the pool's start method
+PLAN_CONTEXT = multiprocessing.get_context("forkserver")
+
+# recommend shows this many pets, a talent can be wanted up to x10
+RECOMMEND_SIZE = 30
+RECOMMEND_MAX_WEIGHT = 10
+
+# how many recent queries keep their rendered pages around, and for how long
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL = 15 * 60
+
+# discord wont show more autocomplete choices than this
+AUTOCOMPLETE_SIZE = 25
+
+# pages are only formatted once someone actually flips to them, these are
+# picked so a page stays well under the embed description limit
+PETS_PER_PAGE = 15
+TALENTS_PER_PAGE = 20
+
+def pet_pages(pets: Sequence[Pet]) -> navi.ChunkedSource[Pet, discord.Embed]:
+    nwidth = len(str(len(pets)))
+
+    def render(chunk: Sequence[Pet], start: int) -> discord.Embed:
+        lines: list[str] = []
+        for index, pet in enumerate(chunk, start=start + 1):
+            name = pet.name
+            if pet.exclusive:
+                name = f"`[exclusive]` {name}"
+
+            rarity = SHORT_RARITIES[pet.rarity]
+            line = (
+                f"[__`{index:<{nwidth}}`__]({pet.url}): `{pet.wow_factor:<2}` `{rarity:<2}` {name}"
+                f" :: {pet.egg_key.removesuffix(' egg')}"
+            )
+
+            extras: list[str] = []
+            if not pet.tradeable:
+                extras.append("untradeable")
+            if pet.school_only:
+                extras.append(f"{pet.school} school only")
+            if extras:
+                line = f"{line} ({' + '.join(extras)})"
+
+            lines.append(line)
+
+        return discord.Embed(description="\n".join(lines))
+
+    return navi.ChunkedSource(pets, render, per_page=PETS_PER_PAGE)
+
+def talent_pages(talents: Sequence[Talent], *, format: PriorityType) -> navi.ChunkedSource[Talent, discord.Embed]:
+    prioritymap = {
+        PriorityType.relative: "priority",
+        PriorityType.absolute: "absolute_priority"
+    }
+    try:
+        key = prioritymap[format]
+    except KeyError:
+        raise ValueError(f"unknown priority type member {format}") \
+            from None
+
+    nwidth = len(str(getattr(talents[-1], key)))
+
+    def render(chunk: Sequence[Talent], start: int) -> discord.Embed:
+        lines: list[str] = []
+        for talent in chunk:
+            name = talent.name
+            hyperlink = f"[__`{getattr(talent, key):<{nwidth}}`__]({talent.url})"
+
+            unlocked = talent.unlocked
+            if unlocked is not None:
+                emoji = "\N{OPEN LOCK}" if unlocked else "\N{LOCK}"
+                emoji += "\N{VARIATION SELECTOR-16}"
+                name = f"{name} `{emoji}`"
+
+            rarity = SHORT_RARITIES[talent.rarity]
+            lines.append(f"{hyperlink}: `{rarity:<2}` {name}")
+
+        return discord.Embed(description="\n".join(lines))
+
+    return navi.ChunkedSource(talents, render, per_page=TALENTS_PER_PAGE)
+
+
+class PlanFlags(BaseFlags):
+    talent: List[Talent] = commands.flag(converter=TalentConverter,
+                                         max_args=-1,
+                                         default=lambda ctx: [],
+                                         description="a talent that should end up in the pool.")
+
+    pet: Pet | None = commands.flag(converter=PetConverter,
+                                    default=None,
+                                    description="the pet the talents should end up on.")
+
+
+class CancelPlan(ui.View):
+    def __init__(self, owner_id: int, cancelled, slot: int):
+        super().__init__(timeout=None)
+        self.owner_id = owner_id
+        self.cancelled = cancelled
+        self.slot = slot
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.owner_id
+
+    @ui.button(label="Cancel", style=discord.ButtonStyle.red)
+    async def cancel(self, interaction: discord.Interaction, button: ui.Button):
+        # the worker notices this the next time it checks in
+        self.cancelled[self.slot] = 1
+        button.disabled = True
+        await interaction.response.edit_message(content="cancelling...", view=self)
+
 
 class ShowHelp(ui.View):
     def __init__(self, context: commands.Context):
@@ -308,6 +660,129 @@ class ShowHelp(ui.View):
 class PetsCog(core.Cog, name="Pets", emoji="\N{RABBIT}"):
     """pet commands."""
 
+    def __init__(self, bot: core.Gobu):
+        super().__init__(bot)
+        self.reloading = asyncio.Lock()
+        # rendered pages for recent queries, keyed on their canonical form
+        self.responses: TTLCache[tuple, Any] = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+        self.resource_mtimes = self.stat_resources()
+
+        # made on first use, and again whenever the dataset changes since
+        # every worker gets its own copy when it starts
+        self.planner: ProcessPoolExecutor | None = None
+        self.planner_dataset: Dataset | None = None
+        # one cancel flag per running/waiting plan, shared with the workers
+        self.plan_cancelled = PLAN_CONTEXT.Array("b", PLAN_SLOTS, lock=False)
+        self.plan_slots = list(range(PLAN_SLOTS))
+
+    # kind -> command whose pages can be flipped without a view in memory
+    PERSISTENT = {
+        "pets": "pets",
+        "talents": "talents",
+        "prioritise": "talents prioritise",
+        "hybrids": "hybrids",
+        "parents": "parents",
+        "hatch": "hatch",
+        "matrix": "hatch matrix",
+        "recommend": "recommend",
+    }
+
+    async def cog_load(self):
+        self.watch_resources.start()
+        for kind in self.PERSISTENT:
+            navi.register(kind, functools.partial(self.rebuild_pages, kind))
+
+    async def cog_unload(self):
+        self.watch_resources.cancel()
+        for kind in self.PERSISTENT:
+            navi.unregister(kind)
+        if self.planner is not None:
+            for slot in range(PLAN_SLOTS):
+                self.plan_cancelled[slot] = 1
+        self.stop_planner()
+
+    async def rebuild_pages(self, kind: str, interaction: discord.Interaction, query: str) -> navi.PageSource:
+        """runs query through the command's converters again, as if it had
+        just been sent, and returns the pages the command would show."""
+
+        assert interaction.message
+        command = self.bot.get_command(self.PERSISTENT[kind])
+        assert command
+
+        ctx = commands.Context(
+            message=interaction.message,
+            bot=self.bot,
+            view=StringView(query),
+            prefix=None,
+            command=command,
+            interaction=interaction,
+        )
+        # every command here takes a single consume-rest argument
+        (param,) = command.clean_params.values()
+        ctx.current_parameter = param
+        ctx.current_argument = query
+        ctx.pets_rebuilding = True  # type: ignore
+        argument = await commands.run_converters(ctx, param.converter, query, param)
+
+        if kind == "pets":
+            return self.pet_source(ctx, argument)
+        if kind == "talents":
+            (source, _) = self.talent_source(ctx, argument)
+            return source
+        if kind == "prioritise":
+            return self.prioritised_source(ctx, argument)
+        if kind == "parents":
+            return self.parent_source(ctx, argument)
+        if kind == "hatch":
+            return self.hatch_source(ctx, argument)
+        if kind == "matrix":
+            return self.matrix_source(ctx, argument)
+        if kind == "recommend":
+            return self.recommend_source(ctx, argument)
+        return self.hybrid_source(ctx, argument)
+
+    async def reload_dataset(self) -> Dataset:
+        """rebuilds the dataset in a worker thread and swaps it in.
+
+        commands that already started keep the dataset they pinned, so
+        nothing is interrupted and the event loop keeps running while the
+        json is parsed and indexed."""
+
+        async with self.reloading:
+            ds = await asyncio.to_thread(snapshot.load)
+            DATASET.swap(ds)
+            self.responses.clear()
+            # workers get their dataset when they start, the next plan
+            # starts new ones
+            self.stop_planner()
+            LOGGER.info("swapped in pets dataset v%d (%d pets, %d talents)",
+                        DATASET.version, len(ds.pets), len(ds.talents))
+            return ds
+
+    @staticmethod
+    def stat_resources() -> dict[str, int]:
+        directory = snapshot.PETS_PATH.parent
+        return {path.name: path.stat().st_mtime_ns for path in directory.glob("*.json")}
+
+    @tasks.loop(seconds=30)
+    async def watch_resources(self):
+        try:
+            mtimes = self.stat_resources()
+        except OSError:
+            # probably halfway through a submodule update, try again next time
+            return
+
+        if mtimes == self.resource_mtimes:
+            return
+
+        self.resource_mtimes = mtimes
+        LOGGER.info("pet resources changed on disk, reloading the dataset")
+        try:
+            await self.reload_dataset()
+        except Exception:
+            # keep serving the old dataset rather than nothing
+            LOGGER.exception("failed to reload the pets dataset")
+
     async def cog_command_error(self, ctx: commands.Context, error: Exception):
         if isinstance(error, commands.MissingFlagArgument):
             await ctx.send(f"`{error.flag.name}` is missing a value")
@@ -340,34 +815,58 @@ class PetsCog(core.Cog, name="Pets", emoji="\N{RABBIT}"):
             # only use range for wow factor
             await ctx.send("wow factors are between 0 and 10")
 
-    async def paginate_pets(self, ctx: commands.Context, pets: list[Pet]):
-        pg = BlankPaginator()
-
-        nwidth = len(str(len(pets)))
-        for index, pet in enumerate(pets, start=1):
-            name = pet["name"]
-            if pet["exclusive"]:
-                name = f"`[exclusive]` {name}"
-
-            rarity = SHORT_RARITIES[pet["rarity"]]
-            url = pet_name_to_url(pet["name"])
-            line = (
-                f"[__`{index:<{nwidth}}`__]({url}): `{pet['wow_factor']:<2}` `{rarity:<2}` {name}"
-                f" :: {pet['egg'].lower().removesuffix(' egg')}"
-            )
+    async def paginate(
+        self,
+        ctx: commands.Context,
+        source: navi.PageSource,
+        *,
+        index: int = 0,
+        kind: str | None = None,
+    ):
+        # kind makes the pages flippable without keeping a view around, the
+        # query is rebuilt from whatever the command was given, see rebuild_pages
+        persistent = None if kind is None else (kind, ctx.current_argument or "")
+        await navi.Navi(navi.proxy(source, index=index)).send(ctx, persistent=persistent)
+
+    def cached(self, ctx: commands.Context, key: tuple, build: Callable[[], T]) -> T:
+        """build() unless the same (canonical) query was answered recently."""
+
+        found = self.responses.get(key)
+        if found is not None:
+            return found
+
+        with metrics.timer("search", key[0]):
+            value = build()
+        # a command that pinned the old dataset could finish after a reload
+        # cleared the cache, dont let it put stale results back in
+        if dataset(ctx) is DATASET.current:
+            self.responses.put(key, value)
+        return value
+
+    def pet_source(self, ctx: commands.Context, pair: tuple[list[Pet], PetSearchFlags | None]) -> navi.PageSource:
+        (pets, flags) = pair
+        ds = dataset(ctx)
+        # the bitset is the same whichever way the name was typed
+        matched = None if pets is ds.pets else ds.pets_to_bitset(pets)
+        key = ("pets", matched, None if flags is None else flags.canonical())
+        return self.cached(ctx, key, lambda: navi.MemoSource(pet_pages(self.search_pets(ctx, pair))))
+
+    def search_pets(self, ctx: commands.Context, pair: tuple[list[Pet], PetSearchFlags | None]) -> list[Pet]:
+        (pets, flags) = pair
+        ds = dataset(ctx)
 
-            extras: list[str] = []
-            if not pet["tradeable"]:
-                extras.append("untradeable")
-            if pet["school_only"]:
-                extras.append(f"{pet['school']} school only")
-            if extras:
-                line = f"{line} ({' + '.join(extras)})"
+        if flags is not None:
+            if pets is ds.pets:
+                pets = ds.pets_from_bitset(flags.resolve(ds, ds.all_pets))
+            else:
+                # keep the order the name search gave us
+                matches = flags.resolve(ds, ds.pets_to_bitset(pets))
+                pets = [pet for pet in pets if matches & ds.pet_bits_by_internal_name[pet.internal_name]]
 
-            pg.add_line(line)
+            if not pets:
+                raise PetCogException("no pets found with those flags", show_help=False)
 
-        src = navi.proxy([discord.Embed(description=p) for p in pg.pages])
-        await navi.Navi(src).send(ctx)
+        return pets
 
     @commands.command(aliases=["pet"], usage="[pets] [flags]")
     async def pets(self, ctx: commands.Context, *, pair: SubstringPetsAndSearchFlags):
@@ -380,164 +879,68 @@ class PetsCog(core.Cog, name="Pets", emoji="\N{RABBIT}"):
         pets spell: deathblade spell: feint talent: mighty wow-factor: 10
         """
 
-        (pets, flags) = pair  # type: ignore
-
-        if flags is not None:
-            def predicate(pet: Pet):
-                if flags.wow_factor is not None:
-                    if pet["wow_factor"] != flags.wow_factor:
-                        return False
-
-                if flags.rarity is not None:
-                    if pet["rarity"] != flags.rarity:
-                        return False
-
-                if flags.school:
-                    if pet["school"].lower() != flags.school:
-                        return False
-
-                if flags.egg:
-                    if pet["egg"].lower() != flags.egg:
-                        return False
-
-                if flags.tradeable is not None:
-                    if pet["tradeable"] is not flags.tradeable:
-                        return False
-
-                if flags.exclusive is not None:
-                    if pet["exclusive"] is not flags.exclusive:
-                        return False
-
-                if flags.hybrid is not None:
-                    hybrid = pet["internal_name"] in HYBRIDS
-                    if flags.hybrid is not hybrid:
-                        return False
-
-                if flags.spell:
-                    spells = [s.lower() for s in pet["spells"]]
-                    for spell in flags.spell:
-                        if all(spell.lower() not in s for s in spells):
-                            return False
-
-                if flags.talent:
-                    pool = pet["talents"] + pet["abilities"]
-                    pool = [t.lower() for t in pool]
-                    for talent in flags.talent:
-                        if talent["name"].lower() not in pool:
-                            return False
-
-                return True
-
-            pets = [pet for pet in pets if predicate(pet)]
-            if not pets:
-                await ctx.send("no pets found with those flags")
-                return
-
-        await self.paginate_pets(ctx, pets)
+        await self.paginate(ctx, self.pet_source(ctx, pair), kind="pets")  # type: ignore
 
-    async def paginate_talents(self,
-        ctx: commands.Context,
-        talents: list[Talent],
-        *,
-        reversed: bool = False,
-        format: PriorityType = PriorityType.relative,
-    ):
-        pg = BlankPaginator()
+    def talent_source(self, ctx: commands.Context, flags: TalentSearchFlags) -> tuple[navi.PageSource, bool]:
+        """the pages for talents matching flags, and whether they should be
+        shown starting from the last page."""
 
-        prioritymap = {
-            PriorityType.relative: "priority",
-            PriorityType.absolute: "absolute_priority"
-        }
-        try:
-            key = prioritymap[format]
-        except KeyError:
-            raise ValueError(f"unknown priority type member {format}") \
-                from None
-
-        nwidth = len(str(talents[-1][key]))
-        for talent in talents:
-            name = talent["name"]
-            hyperlink = f"[__`{talent[key]:<{nwidth}}`__]({talent_name_to_url(name)})"
+        def build() -> tuple[navi.PageSource, bool]:
+            (talents, reversed) = self.search_talents(ctx, flags)
+            return (navi.MemoSource(talent_pages(talents, format=flags.format)), reversed)
 
-            unlocked = talent["unlocked"]
-            if unlocked is not None:
-                emoji = "\N{OPEN LOCK}" if unlocked else "\N{LOCK}"
-                emoji += "\N{VARIATION SELECTOR-16}"
-                name = f"{name} `{emoji}`"
-
-            rarity = SHORT_RARITIES[talent["rarity"]]
-            pg.add_line(f"{hyperlink}: `{rarity:<2}` {name}")
-
-        src = navi.proxy([discord.Embed(description=p) for p in pg.pages], index=reversed and len(pg.pages) - 1)
-        await navi.Navi(src).send(ctx)
-
-    @commands.group(invoke_without_command=True, aliases=["talent", "ta"])
-    async def talents(self, ctx: commands.Context, *, flags: TalentSearchFlags):
-        """search talents.
-        lower priority talents are higher when looking at a pet's talent in-game.
+        return self.cached(ctx, ("talents", flags.canonical(ctx)), build)
 
-        EXAMPLE:
-        talents below: furnace above: balance-sniper
-        talents between: mighty, storm-giver rarity: ultra-rare
-        talents between: spell-proof, spell-defy rarity: common rarity: uncommon
-        """
+    def search_talents(self, ctx: commands.Context, flags: TalentSearchFlags) -> tuple[list[Talent], bool]:
+        """the talents matching flags, and whether they should be shown
+        starting from the last page."""
 
-        assert ctx.command
         if flags.empty(ctx):
-            await ctx.send("i dont know any of those flag or i didnt get enough.",
-                            view=ShowHelp(ctx))
-            return
+            raise PetCogException("i dont know any of those flag or i didnt get enough.")
 
         if (flags.above or flags.below) and flags.between:
-            await ctx.send("between is mutually exclusive with above and below")
-            return
+            raise PetCogException("between is mutually exclusive with above and below", show_help=False)
+
+        index = flags.format.index(dataset(ctx))
 
         if flags.between:
-            (below, above) = sorted(flags.between, key=lambda t: t["priority"])
+            (below, above) = sorted(flags.between, key=index.priority)
         else:
             (below, above) = (flags.below, flags.above)
 
         if below and above:
-            if below["internal_name"] == above["internal_name"]:
-                return await ctx.send("um those are the same talent so there's nothing between them")
-
-            elif below["priority"] > above["priority"]:
-                return await ctx.send("both talents have to be in-range of each other")
+            if below.internal_name == above.internal_name:
+                raise PetCogException("um those are the same talent so there's nothing between them",
+                                      show_help=False)
 
-        talents: list[Talent] = []
-        rarities = set(flags.rarity)
-
-        for talent in TALENTS_SORTED_BY_PRIORITY:
-            name = talent["internal_name"]
+            elif index.priority(below) > index.priority(above):
+                raise PetCogException("both talents have to be in-range of each other", show_help=False)
 
-            # always add boundaries if they were explicility specified
-            if (below and name == below["internal_name"]
-                or above and name == above["internal_name"]):
-                talents.append(talent)
-                continue
-
-            if rarities and talent["rarity"] not in rarities:
-                continue
-
-            if flags.unlockable is False:
-                # only valid value is unlockable: no
-                if talent["unlocked"] is not None:
-                    continue
-
-            if above and above["priority"] < talent["priority"]:
-                continue
-            if below and below["priority"] > talent["priority"]:
-                continue
-
-            talents.append(talent)
+        # only valid value is unlockable: no
+        lockable = flags.unlockable is not False
+        talents = index.between(below, above, rarities=set(flags.rarity), lockable=lockable)
 
         # only paginate talents if we actually found anything in-between
         found = len(talents) - bool(above) - bool(below)
         if found < 1:
-            await ctx.send("no talents found")
-            return
+            raise PetCogException("no talents found", show_help=False)
 
-        await self.paginate_talents(ctx, talents, reversed=bool(above and not below), format=flags.format)
+        return (talents, bool(above and not below))
+
+    @commands.group(invoke_without_command=True, aliases=["talent", "ta"])
+    async def talents(self, ctx: commands.Context, *, flags: TalentSearchFlags):
+        """search talents.
+        lower priority talents are higher when looking at a pet's talent in-game.
+
+        EXAMPLE:
+        talents below: furnace above: balance-sniper
+        talents between: mighty, storm-giver rarity: ultra-rare
+        talents between: spell-proof, spell-defy rarity: common rarity: uncommon
+        """
+
+        assert ctx.command
+        (source, reversed) = self.talent_source(ctx, flags)
+        await self.paginate(ctx, source, index=source.max_pages - 1 if reversed else 0, kind="talents")
 
     @talents.command(name="firstgen", aliases=["fg", "pool"])
     async def talents_firstgen(self, ctx: commands.Context, *, pet: Annotated[Pet, PetConverter]):
@@ -545,8 +948,46 @@ class PetsCog(core.Cog, name="Pets", emoji="\N{RABBIT}"):
 
         embed = discord.Embed()
         # im extremely lazy
-        embed.add_field(name="talents", value="\n".join(pet["talents"]))
-        embed.add_field(name="abilities (derby talents)", value="\n".join(pet["abilities"]))
+        embed.add_field(name="talents", value="\n".join(pet.talents))
+        embed.add_field(name="abilities (derby talents)", value="\n".join(pet.abilities))
+        await ctx.send(embed=embed)
+
+    def prioritised_source(self, ctx: commands.Context, talents: list[Talent]) -> navi.PageSource:
+        # sorting doesnt care what order they were given in
+        key = ("prioritise", frozenset(talent.internal_name for talent in talents))
+        return self.cached(ctx, key, lambda: navi.MemoSource(
+            talent_pages(dataset(ctx).talents_by_priority.sort(talents), format=PriorityType.relative)
+        ))
+
+    @commands.command(aliases=["sim"])
+    async def simulate(self, ctx: commands.Context, *, pet: Annotated[Pet, PetConverter]):
+        """rank a pet's first gen talents by how likely they are to manifest by mega.
+        it's an estimate, the game doesnt publish the actual chances.
+
+        EXAMPLE:
+        simulate rain core
+        """
+
+        ds = dataset(ctx)
+        pool = [ds.talents_by_lowercase_name[name.lower()] for name in pet.talents
+                if name.lower() in ds.talents_by_lowercase_name]
+        if not pool:
+            raise PetCogException(f"dont know any of {pet.name}'s talents", show_help=False)
+
+        pool = ds.talents_by_priority.sort(pool)
+        rarities = tuple(talent.rarity for talent in pool)
+        # cheap enough, but there's no reason to hold up the event loop
+        chances = await asyncio.to_thread(manifest.manifest_chances, rarities)
+
+        # the chances come from guessed roll odds (see manifest), so only
+        # their order is worth showing. ties stay in priority order
+        ranked = sorted(zip(pool, chances), key=lambda entry: -entry[1])
+        lines = [
+            f"`{rank}.` [{talent.name}]({talent.url}) `{SHORT_RARITIES[talent.rarity]}`"
+            for rank, (talent, _) in enumerate(ranked, 1)
+        ]
+        embed = discord.Embed(title=f"{pet.name} by mega, most likely first", description="\n".join(lines))
+        embed.set_footer(text="an estimate, the game doesnt publish the actual chances")
         await ctx.send(embed=embed)
 
     @talents.command(name="prioritise", aliases=["prioritize", "p"])
@@ -556,8 +997,11 @@ class PetsCog(core.Cog, name="Pets", emoji="\N{RABBIT}"):
 
         EXAMPLE: talents prioritise death-dealer, spell-proof, mighty
         """
-        talents.sort(key=lambda t: t["priority"])
-        await self.paginate_talents(ctx, talents)
+        await self.paginate(ctx, self.prioritised_source(ctx, talents), kind="prioritise")
+
+    def hybrid_source(self, ctx: commands.Context, pet: Pet) -> navi.PageSource:
+        return self.cached(ctx, ("hybrids", pet.internal_name),
+                           lambda: navi.ListSource(self.hybrid_pages(ctx, pet)))
 
     @commands.command()
     async def hybrids(self, ctx: commands.Context, *, pet: Annotated[Pet, PetConverter]):
@@ -568,79 +1012,617 @@ class PetsCog(core.Cog, name="Pets", emoji="\N{RABBIT}"):
         hybrids rain core
         """
 
-        morphs = MORPHS_BY_PET_INTERNAL_NAME.get(pet["internal_name"], [])
-        if not morphs:
-            await ctx.send("no hybrids for this pet")
-            return
+        await self.paginate(ctx, self.hybrid_source(ctx, pet), kind="hybrids")
+
+    def hybrid_pages(self, ctx: commands.Context, pet: Pet) -> list[str]:
+        ds = dataset(ctx)
+        partners = ds.partners(pet)
+        if not partners:
+            raise PetCogException("no hybrids for this pet", show_help=False)
+
+        pairs: dict[tuple[str, str], tuple[Pet, Pet]] = {}
+        for other_pet in partners:
+            for baby in ds.babies(pet, other_pet):
+                pairs[(baby.name, other_pet.name)] = (baby, other_pet)
 
-        pairs: set[tuple[str, str]] = set()
-        for morph in morphs:
-            other_pet = morph["other"]
-            baby = morph["baby"]
+        alphabetical = sorted(pairs.items())
+        pg = BlankPaginator()
+        for _, (baby, other_pet) in alphabetical:
+            pg.add_line(f"[{baby.name}]({baby.url}) (hatched with [{other_pet.name}]({other_pet.url}))")
+
+        return pg.pages
 
-            other_pet = PETS_BY_INTERNAL_NAME[other_pet]["name"]
-            baby = PETS_BY_INTERNAL_NAME[baby]["name"]
+    def parent_source(self, ctx: commands.Context, pet: Pet) -> navi.PageSource:
+        return self.cached(ctx, ("parents", pet.internal_name),
+                           lambda: navi.ListSource(self.parent_pages(ctx, pet)))
 
-            pairs.add((baby, other_pet))
+    @commands.command(aliases=["parent"])
+    async def parents(self, ctx: commands.Context, *, pet: Annotated[Pet, PetConverter]):
+        """show which pairs of pets hatch a hybrid, most likely first.
+
+        EXAMPLE:
+        parents clamoring ghulture
+        """
+
+        await self.paginate(ctx, self.parent_source(ctx, pet), kind="parents")
+
+    def parent_pages(self, ctx: commands.Context, pet: Pet) -> list[str]:
+        ds = dataset(ctx)
+        parents = ds.parents_of(pet)
+        if not parents:
+            raise PetCogException(f"{pet.name} isnt a hybrid", show_help=False)
+
+        ranked: list[tuple[float, str, str, Pet, Pet]] = []
+        for parent, other in parents:
+            (_, chance) = ds.hatch_outcomes(parent, other)[pet.internal_name]
+            ranked.append((-round(chance, 2), parent.name, other.name, parent, other))
+        ranked.sort(key=lambda entry: entry[:3])
 
-        alphabetical = sorted(pairs)
         pg = BlankPaginator()
-        for baby, other_pet in alphabetical:
+        for negated, _, _, parent, other in ranked:
             pg.add_line(
-                f"[{baby}]({pet_name_to_url(baby)}) (hatched with [{other_pet}]({pet_name_to_url(other_pet)}))")
+                f"{-negated}%: [{parent.name}]({parent.url}) [{parent.wow_factor}]"
+                f" + [{other.name}]({other.url}) [{other.wow_factor}]"
+            )
 
-        await navi.Navi(navi.proxy(pg.pages)).send(ctx)
+        return pg.pages
 
-    @commands.command()
+    @commands.group(invoke_without_command=True)
     async def hatch(self, ctx: commands.Context, *,
-                    pets: Annotated[list[Pet], DelimitedPets(bound=2, skip_duplicate=False)]):
-        """calculate baby chance from 2 pet hatch.
+                    pets: Annotated[list[Pet], DelimitedPets(skip_duplicate=False)]):
+        """calculate baby chance from a 2 pet hatch, or every pair of a few pets.
 
         EXAMPLE:
         hatch wraith, dark hound
         hatch rain core, ghulture
+        hatch rain core, ghulture, wraith
         """
 
-        # thx TTA/lntrn
-        def pet_hatch_chance(a: int, b: int) -> float:
-            n = (11 - a) / (22 - (a + b))
-            return round(n * 100, 2)
+        if len(pets) < 2:
+            raise NotEnoughPets(bound=2)
+        if len(pets) > HATCH_MAX_PETS:
+            raise TooManyPets(bound=HATCH_MAX_PETS)
+
+        await self.paginate(ctx, self.hatch_source(ctx, pets), kind="hatch")
 
-        (peta, petb) = pets
-        (af, bf) = (peta["wow_factor"], petb["wow_factor"])
+    def hatch_source(self, ctx: commands.Context, pets: list[Pet]) -> navi.PageSource:
+        key = ("hatch", *(pet.internal_name for pet in pets))
+        return self.cached(ctx, key, lambda: navi.ListSource(self.hatch_pages(ctx, pets)))
+
+    def hatch_pages(self, ctx: commands.Context, pets: list[Pet]) -> list[str]:
+        pg = BlankPaginator()
+        for index, peta in enumerate(pets):
+            for petb in pets[index + 1 :]:
+                if len(pets) > 2:
+                    pg.add_line(f"**{peta.name} + {petb.name}**")
+                for line in self.hatch_lines(dataset(ctx), peta, petb):
+                    pg.add_line(line)
+                if len(pets) > 2:
+                    pg.add_line()
+        return pg.pages
+
+    def hatch_lines(self, ds: Dataset, peta: Pet, petb: Pet) -> list[str]:
+        (af, bf) = (peta.wow_factor, petb.wow_factor)
         (peta_chance, petb_chance) = (pet_hatch_chance(af, bf), pet_hatch_chance(bf, af))
 
         def describe(pet: Pet) -> str:
-            description = f"{pet['name']} [{pet['wow_factor']}]"
-            if pet["exclusive"]:
+            description = f"{pet.name} [{pet.wow_factor}]"
+            if pet.exclusive:
                 description = f"[EXCLUSIVE] {description}"
             return description
 
-        pg = BlankPaginator()
-
-        pg.add_line(f"{describe(peta)}: {peta_chance}% ({peta['egg']})")
-        pg.add_line(f"{describe(petb)}: {petb_chance}% ({petb['egg']})")
+        lines = [
+            f"{describe(peta)}: {peta_chance}% ({peta.egg})",
+            f"{describe(petb)}: {petb_chance}% ({petb.egg})",
+        ]
 
         # append potential hybrids
-        morphs: list[MorphException] = MORPHS_BY_PET_INTERNAL_NAME.get(peta["internal_name"], [])
-        hybrids = [
-            PETS_BY_INTERNAL_NAME[m["baby"]]
-            for m in morphs
-            if m["other"] == petb["internal_name"]
-        ]
+        hybrids = ds.babies(peta, petb)
 
-        without_duplicate_generations = set(pet["name"] for pet in hybrids)
+        without_duplicate_generations = set(pet.name for pet in hybrids)
         if offspring := len(without_duplicate_generations):
-            pg.add_line()
+            lines.append("")
             if offspring == 1:
-                pg.add_line(f"chance to get a {hybrids[0]['name']} from this hatch")
+                lines.append(f"chance to get a {hybrids[0].name} from this hatch")
             else:
-                pg.add_line(
+                lines.append(
                     f"chance to get any of these {offspring} pets from this hatch:")
                 for pet in without_duplicate_generations:
-                    pg.add_line(f"- {pet}")
+                    lines.append(f"- {pet}")
+
+        return lines
+
+    def matrix_source(self, ctx: commands.Context, pair: tuple[Pet, PetSearchFlags | None]) -> navi.PageSource:
+        (pet, flags) = pair
+        key = ("matrix", pet.internal_name, None if flags is None else flags.canonical())
+        return self.cached(ctx, key, lambda: navi.ListSource(self.matrix_pages(ctx, pet, flags)))
+
+    @hatch.command(name="matrix", aliases=["m"], usage="<pet> [flags]")
+    async def hatch_matrix(self, ctx: commands.Context, *, pair: PetAndSearchFlags):
+        """rank every partner for a pet by the chance of getting that pet back.
+        the partners can be narrowed down with the same flags as `pets`.
+
+        EXAMPLE:
+        hatch matrix rain core
+        hatch matrix ghulture school: storm wow-factor: 10
+        """
+
+        await self.paginate(ctx, self.matrix_source(ctx, pair), kind="matrix")  # type: ignore
+
+    def matrix_ranking(self, ds: Dataset, pet: Pet, candidates: int) -> list[tuple[float, Pet, dict[str, tuple[Pet, float]]]]:
+        """the HATCH_MATRIX_SIZE best partners out of the candidates bitset
+        as (chance of getting pet, partner, every outcome).
+
+        without hybrids the chance only depends on the partner's wow factor,
+        so it's worked out once per wow factor and applied to that whole
+        slice of the bitset. only partners with hybrids are looked at one
+        by one, and plain partners are only turned into pets a wow factor
+        at a time until there's enough of them to fill the ranking."""
+
+        candidates &= ~ds.pet_bits_by_internal_name[pet.internal_name]
+        special = candidates & ds.pets_to_bitset(ds.partners(pet))
+
+        ranked: list[tuple[float, Pet, dict[str, tuple[Pet, float]]]] = []
+        for partner in ds.pets_from_bitset(special):
+            outcomes = ds.hatch_outcomes(pet, partner)
+            (_, chance) = outcomes.get(pet.internal_name, (pet, 0.0))
+            ranked.append((chance, partner, outcomes))
+
+        plain = candidates & ~special
+        wanted = HATCH_MATRIX_SIZE
+        # a higher wow factor partner always leaves more room for pet
+        for wow_factor in range(10, -1, -1):
+            if wanted <= 0:
+                break
+            bits = plain & ds.pet_bits_by_wow_factor.get(wow_factor, 0)
+            if not bits:
+                continue
+
+            chance = float(pet_hatch_chance(pet.wow_factor, wow_factor))
+            for partner in ds.pets_from_bitset(bits):
+                ranked.append((chance, partner, {}))
+            wanted -= bits.bit_count()
+
+        ranked.sort(key=lambda entry: (-entry[0], entry[1].name))
+        return ranked[:HATCH_MATRIX_SIZE]
 
-        await navi.Navi(navi.proxy(pg.pages)).send(ctx)
+    def matrix_pages(self, ctx: commands.Context, pet: Pet, flags: PetSearchFlags | None) -> list[str]:
+        ds = dataset(ctx)
+        candidates = ds.all_pets if flags is None else flags.resolve(ds, ds.all_pets)
+        ranked = self.matrix_ranking(ds, pet, candidates)
+        if not ranked:
+            raise PetCogException("no partners found with those flags", show_help=False)
+
+        pg = BlankPaginator()
+        pg.add_line(f"chance of getting {pet.name} [{pet.wow_factor}] back, best {len(ranked)} partners:")
+        for chance, partner, outcomes in ranked:
+            line = f"`{chance:>5.2f}%` [{partner.name}]({partner.url}) [{partner.wow_factor}]"
+            hybrids = [
+                f"{baby.name} {baby_chance:.2f}%"
+                for baby, baby_chance in outcomes.values()
+                if baby.internal_name not in (pet.internal_name, partner.internal_name)
+            ]
+            if hybrids:
+                line = f"{line} (hybrids: {', '.join(hybrids)})"
+            pg.add_line(line)
+
+        return pg.pages
+
+    def recommend_source(self, ctx: commands.Context, wishlist: dict[Talent, float]) -> navi.PageSource:
+        key = ("recommend", frozenset((talent.internal_name, weight) for talent, weight in wishlist.items()))
+        return self.cached(ctx, key, lambda: navi.ListSource(self.recommend_pages(ctx, wishlist)))
+
+    @commands.command(aliases=["rec"], usage="<talents>")
+    async def recommend(self, ctx: commands.Context, *,
+                        wishlist: Annotated[dict[Talent, float], WeightedTalents]):
+        """find the pets whose pools have the most of some talents.
+        put x and a number after a talent to make it count more.
+
+        EXAMPLE:
+        recommend mighty, spell-proof, pain-giver
+        recommend mighty x3, spell-defy x2, pain-giver
+        """
+
+        await self.paginate(ctx, self.recommend_source(ctx, wishlist), kind="recommend")
+
+    def recommend_pages(self, ctx: commands.Context, wishlist: dict[Talent, float]) -> list[str]:
+        ds = dataset(ctx)
+        found = ds.recommend(wishlist, limit=RECOMMEND_SIZE)
+        if not found:
+            raise PetCogException("no pets have any of those talents", show_help=False)
+
+        total = sum(wishlist.values())
+        pg = BlankPaginator()
+        for score, pet, matched in found:
+            talents = [ds.talents_sorted_by_priority[rank].name for rank in set_bits(matched)]
+            pg.add_line(f"`{score / total:>4.0%}` [{pet.name}]({pet.url}): {', '.join(talents)}")
+
+        return pg.pages
+
+    def planner_pool(self, ds: Dataset) -> ProcessPoolExecutor:
+        if ds is not DATASET.current:
+            # the workers only ever have the current dataset, and the pets
+            # in this plan came from one that's since been reloaded
+            raise PetCogException("the pets data just got reloaded, try that again", show_help=False)
+
+        if self.planner is None or self.planner_dataset is not ds:
+            self.stop_planner()
+            self.planner = ProcessPoolExecutor(
+                PLAN_WORKERS,
+                mp_context=PLAN_CONTEXT,
+                initializer=planner.init,
+                initargs=(ds, self.plan_cancelled),
+            )
+            self.planner_dataset = ds
+        return self.planner
+
+    def stop_planner(self):
+        if self.planner is not None:
+            # searches already running on it still finish
+            self.planner.shutdown(wait=False, cancel_futures=True)
+            self.planner = self.planner_dataset = None
+
+    def drop_planner(self, pool: ProcessPoolExecutor):
+        # every plan that was on a broken pool finds out, only the first
+        # one should throw away the new pool that might have replaced it
+        if self.planner is pool:
+            self.stop_planner()
+
+    def submit_plan(self, ds: Dataset, targets: tuple[str, ...], goal: str | None, slot: int
+    ) -> tuple[ProcessPoolExecutor, Future[planner.Plan]]:
+        pool = self.planner_pool(ds)
+        try:
+            return (pool, pool.submit(
+                planner.search, targets, goal, slot=slot, max_hatches=PLAN_MAX_HATCHES, budget=PLAN_TIME_BUDGET
+            ))
+        except BrokenProcessPool:
+            # a worker died (eg. killed for running out of memory) and the
+            # pool takes nothing after that, so start over on a new one
+            self.drop_planner(pool)
+            pool = self.planner_pool(ds)
+            return (pool, pool.submit(
+                planner.search, targets, goal, slot=slot, max_hatches=PLAN_MAX_HATCHES, budget=PLAN_TIME_BUDGET
+            ))
+
+    async def run_plan(self, ctx: commands.Context, targets: tuple[str, ...], goal: str | None
+    ) -> tuple[planner.Plan, Dataset, discord.Message]:
+        if not self.plan_slots:
+            raise PetCogException("too many plans are being worked out right now, try again in a bit",
+                                  show_help=False)
+
+        ds = dataset(ctx)
+        pool = self.planner_pool(ds)
+        loop = asyncio.get_running_loop()
+        slot = self.plan_slots.pop()
+        self.plan_cancelled[slot] = 0
+        future: Future[planner.Plan] | None = None
+
+        view = CancelPlan(ctx.author.id, self.plan_cancelled, slot)
+        try:
+            (pool, future) = self.submit_plan(ds, targets, goal, slot)
+            message = await ctx.send("working out a plan, this can take a few seconds", view=view)
+            try:
+                # a bit of leeway on top of the budget for waiting on a worker
+                plan = await asyncio.wait_for(asyncio.wrap_future(future), PLAN_TIME_BUDGET * 2)
+            except BrokenProcessPool:
+                # the worker died on it, or the pool was already broken
+                # before it noticed. one more go on a new one
+                self.drop_planner(pool)
+                (pool, future) = self.submit_plan(ds, targets, goal, slot)
+                plan = await asyncio.wait_for(asyncio.wrap_future(future), PLAN_TIME_BUDGET * 2)
+        except BrokenProcessPool:
+            self.drop_planner(pool)
+            raise PetCogException("the planner fell over working that out, try again with fewer talents",
+                                  show_help=False) from None
+        except BaseException as e:
+            # timed out waiting or the command itself was cancelled
+            self.plan_cancelled[slot] = 1
+            if future is not None:
+                future.cancel()
+            if not isinstance(e, asyncio.TimeoutError):
+                raise
+            plan = planner.Plan("timeout", None, 0, (), 0.0, 0)
+        finally:
+            view.stop()
+            # the slot is only free again once the worker is really done with it
+            if future is None:
+                self.plan_slots.append(slot)
+            else:
+                future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.plan_slots.append, slot))
+
+        return (plan, ds, message)
+
+    @commands.command(usage="[flags]")
+    async def plan(self, ctx: commands.Context, *, flags: PlanFlags):
+        """find the fewest hatches that get some talents into one pet's pool.
+        assumes a baby can get talents from both of its parents' pools.
+
+        EXAMPLE:
+        plan talent: mighty talent: spell-proof talent: pain-giver
+        plan talent: mighty talent: spell-defy pet: rain core
+        """
+
+        talents = list({talent.lower_name: talent for talent in flags.talent}.values())
+        if not talents:
+            raise NotEnoughTalents(bound=1)
+        if len(talents) > PLAN_MAX_TALENTS:
+            raise TooManyTalents(bound=PLAN_MAX_TALENTS)
+
+        targets = tuple(talent.lower_name for talent in talents)
+        goal = None if flags.pet is None else flags.pet.internal_name
+        key = ("plan", frozenset(targets), goal)
+        if (content := self.responses.get(key)) is not None:
+            await ctx.send(content)
+            return
+
+        (plan, ds, message) = await self.run_plan(ctx, targets, goal)
+        if plan.status == "cancelled":
+            await message.edit(content="cancelled", view=None)
+            return
+        if plan.status == "timeout":
+            await message.edit(content=f"couldnt finish planning in {PLAN_TIME_BUDGET:g}s, try fewer talents",
+                               view=None)
+            return
+
+        content = self.describe_plan(ds, plan, talents)
+        # exhausted is as final as found, both are worth keeping
+        if ds is DATASET.current:
+            self.responses.put(key, content)
+        await message.edit(content=content, view=None)
+
+    def describe_plan(self, ds: Dataset, plan: planner.Plan, talents: list[Talent]) -> str:
+        if plan.status != "found":
+            return f"theres no way to get all of those into one pool in {PLAN_MAX_HATCHES} hatches or less"
+
+        def names(mask: int) -> str:
+            return ", ".join(talent.name for bit, talent in enumerate(talents) if mask >> bit & 1)
+
+        def describe(internal_name: str) -> str:
+            pet = ds.pets_by_internal_name[internal_name]
+            return f"[{pet.name}]({pet.url}) [{pet.wow_factor}]"
+
+        assert plan.start
+        start = f"start with {describe(plan.start)}"
+        if plan.carried:
+            start = f"{start} (has {names(plan.carried)})"
+        lines = [start]
+
+        carried = plan.carried
+        for number, step in enumerate(plan.steps, start=1):
+            line = f"{number}. hatch with {describe(step.partner)}"
+            if added := step.carried & ~carried:
+                line = f"{line}, adds {names(added)}"
+            if step.baby is not None:
+                line = f"{line}, hoping for {describe(step.baby)} ({step.chance}%)"
+            lines.append(line)
+            carried = step.carried
+
+        if not plan.steps:
+            lines.append("thats already everything!")
+        elif plan.steps[0].baby is not None:
+            lines.append(f"\nchance of every hatch going to plan: {plan.chance}%")
+
+        return "\n".join(lines)
+
+    ## slash commands
+    # these turn their options back into what the prefix command would have
+    # been sent and run that, so converters, errors and persistent pages all
+    # work the same. they're what's left when the bot runs without the
+    # message content intent, see Gobu(interactions_only=True)
+
+    async def invoke_as(self, interaction: discord.Interaction, name: str, query: str):
+        """runs the prefix command name as if query had been typed after it."""
+
+        command = self.bot.get_command(name)
+        assert command
+
+        ctx = await commands.Context.from_interaction(interaction)
+        ctx.command = command
+        ctx.invoked_with = command.name
+        ctx.view = StringView(query)
+        await self.bot.invoke(ctx)
+
+    # autocomplete runs on every keystroke, so these only ever look at the
+    # slice of a PrefixIndex that starts with what was typed
+
+    @staticmethod
+    def choices(names: Iterable[str | tuple[str, str]], *, before: str = "") -> list[app_commands.Choice[str]]:
+        choices: list[app_commands.Choice[str]] = []
+        for name in names:
+            # (shown, filled in) when the name itself cant be filled in
+            (name, value) = name if isinstance(name, tuple) else (name, name)
+            (name, value) = (f"{before}{name}", f"{before}{value}")
+            # choice names and values are both capped at 100 characters
+            if len(name) <= 100 and len(value) <= 100:
+                choices.append(app_commands.Choice(name=name, value=value))
+        return choices
+
+    @staticmethod
+    def narrow_pets(ds: Dataset, namespace: app_commands.Namespace) -> int:
+        """the bitset of pets matching the /pets options filled in so far."""
+
+        bits = ds.all_pets
+        if namespace.school:
+            bits &= ds.pet_bits_by_school.get(namespace.school, 0)
+        if namespace.rarity:
+            bits &= ds.pet_bits_by_rarity.get(RARITIES[namespace.rarity], 0)
+        if (wow_factor := getattr(namespace, "wow-factor")) is not None:
+            bits &= ds.pet_bits_by_wow_factor.get(wow_factor, 0)
+        if namespace.egg:
+            egg = namespace.egg.lower().removesuffix(" egg") + " egg"
+            bits &= ds.pet_bits_by_egg.get(egg, ds.all_pets)
+
+        for subset, wanted in (
+            (ds.exclusive_pets, namespace.exclusive),
+            (ds.tradeable_pets, namespace.tradeable),
+            (ds.hybrid_pets, namespace.hybrid),
+        ):
+            if wanted is not None:
+                bits &= subset if wanted else ~subset
+
+        # half typed talents just dont narrow anything yet
+        for name in delimited(namespace.talents or ""):
+            # see TalentConverter.argument for what completing fills in
+            if talent := ds.talents_by_internal_name.get(name) or ds.talents_by_lowercase_name.get(name.lower()):
+                bits &= ds.pet_bits_by_talent.get(talent.lower_name, 0)
+
+        return bits
+
+    async def complete_pets(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        ds = DATASET.current
+        (before, comma, current) = current.rpartition(",")
+        before = f"{before}, " if comma else ""
+
+        accept = None
+        if interaction.command is self.slash_pets:
+            bits = self.narrow_pets(ds, interaction.namespace)
+            if bits != ds.all_pets:
+                by_name = ds.pet_bits_by_internal_name
+                accept = lambda pet: bits & by_name[pet.internal_name]
+
+        pets = ds.pets_by_prefix.complete(
+            current.strip().lower(),
+            limit=AUTOCOMPLETE_SIZE,
+            accept=accept,
+            score=lambda pet: POPULAR_PETS[pet.internal_name],
+        )
+        return self.choices((pet.name for pet in pets), before=before)
+
+    async def complete_talents(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        ds = DATASET.current
+        (before, comma, current) = current.rpartition(",")
+        before = f"{before}, " if comma else ""
+        talents = ds.talents_by_prefix.complete(
+            current.strip().lower(),
+            limit=AUTOCOMPLETE_SIZE,
+            score=lambda talent: POPULAR_TALENTS[talent.internal_name],
+        )
+        # /pets talents and /talents between are split on commas
+        return self.choices(
+            ((talent.name, TalentConverter.argument(ds, talent)) for talent in talents), before=before
+        )
+
+    async def complete_eggs(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        eggs = DATASET.current.eggs_by_prefix.complete(
+            current.strip().lower(),
+            limit=AUTOCOMPLETE_SIZE,
+            score=POPULAR_EGGS.__getitem__,
+        )
+        return self.choices(eggs)
+
+    @app_commands.command(name="pets", description="show full info on some pets.")
+    @app_commands.rename(wow_factor="wow-factor")
+    @app_commands.describe(
+        name="part of a pet's name.",
+        talents="first gen talents/derby abilities, separated by commas.",
+        spells="item card spells, separated by commas (inaccurate).",
+        wow_factor="needs to be this wow factor.",
+        rarity="needs to be this rarity.",
+        school="needs to belong to this school.",
+        egg="needs to be hatched from this egg.",
+        exclusive="whether the pet is exclusive.",
+        tradeable="whether the pet is tradeable between wizards.",
+        hybrid="whether the pet is a hybrid.",
+    )
+    @app_commands.autocomplete(name=complete_pets, talents=complete_talents, egg=complete_eggs)
+    async def slash_pets(
+        self,
+        interaction: discord.Interaction,
+        name: str | None = None,
+        talents: str | None = None,
+        spells: str | None = None,
+        wow_factor: app_commands.Range[int, 0, 10] | None = None,
+        rarity: Literal["common", "uncommon", "rare", "ultra-rare", "epic"] | None = None,
+        school: Literal["fire", "ice", "storm", "life", "death", "myth"] | None = None,
+        egg: str | None = None,
+        exclusive: bool | None = None,
+        tradeable: bool | None = None,
+        hybrid: bool | None = None,
+    ):
+        query = flag_query(
+            name,
+            talent=list(delimited(talents)) if talents else None,
+            spell=list(delimited(spells)) if spells else None,
+            wow_factor=wow_factor,
+            rarity=rarity,
+            school=school,
+            egg=egg,
+            exclusive=exclusive,
+            tradeable=tradeable,
+            hybrid=hybrid,
+        )
+        if not query:
+            await interaction.response.send_message("give me a name or at least one option", ephemeral=True)
+            return
+        await self.invoke_as(interaction, "pets", query)
+
+    @app_commands.command(name="talents", description="search talents.")
+    @app_commands.describe(
+        above="needs to be above this talent.",
+        below="needs to be below this talent.",
+        between="only include talents between 2 others, separated by a comma.",
+        rarity="only include talents of this rarity.",
+        unlockable="pick false to filter out locked/unlocked talents.",
+        format="relative or absolute priority.",
+    )
+    @app_commands.autocomplete(above=complete_talents, below=complete_talents, between=complete_talents)
+    async def slash_talents(
+        self,
+        interaction: discord.Interaction,
+        above: str | None = None,
+        below: str | None = None,
+        between: str | None = None,
+        rarity: Literal["common", "uncommon", "rare", "ultra-rare", "epic"] | None = None,
+        unlockable: bool | None = None,
+        format: Literal["relative", "absolute"] | None = None,
+    ):
+        query = flag_query(above=above, below=below, between=between, rarity=rarity,
+                           unlockable=unlockable, format=format)
+        await self.invoke_as(interaction, "talents", query)
+
+    @app_commands.command(name="hybrids", description="show pet's hybrids.")
+    @app_commands.describe(pet="the pet to show hybrids for.")
+    @app_commands.autocomplete(pet=complete_pets)
+    async def slash_hybrids(self, interaction: discord.Interaction, pet: str):
+        await self.invoke_as(interaction, "hybrids", pet)
+
+    @app_commands.command(name="hatch", description="calculate baby chance from a 2 pet hatch, or every pair of a few pets.")
+    @app_commands.describe(
+        first="the first pet.",
+        second="the second pet.",
+        others=f"up to {HATCH_MAX_PETS - 2} more pets, separated by commas.",
+    )
+    @app_commands.autocomplete(first=complete_pets, second=complete_pets, others=complete_pets)
+    async def slash_hatch(self, interaction: discord.Interaction, first: str, second: str, others: str | None = None):
+        await self.invoke_as(interaction, "hatch", ", ".join([first, second, *delimited(others or "")]))
+
+    @commands.group(name="dataset", invoke_without_command=True, hidden=True)
+    @commands.is_owner()
+    async def dataset_info(self, ctx: commands.Context):
+        """show which pets dataset is loaded."""
+
+        ds = DATASET.current
+        await ctx.send(
+            f"v{DATASET.version} loaded {discord.utils.format_dt(DATASET.loaded_at, 'R')}: "
+            f"{len(ds.pets)} pets, {len(ds.talents)} talents"
+            f"\nresponse cache: {len(self.responses)}/{self.responses.maxsize} entries,"
+            f" {self.responses.hits} hits, {self.responses.misses} misses ({self.responses.hit_rate:.0%})"
+        )
+
+    @dataset_info.command(name="reload")
+    @commands.is_owner()
+    async def dataset_reload(self, ctx: commands.Context):
+        """rebuild the pets dataset from resources/static without restarting."""
+
+        async with ctx.typing():
+            try:
+                ds = await self.reload_dataset()
+            except Exception as e:
+                LOGGER.exception("failed to reload the pets dataset")
+                await ctx.send(f"couldnt reload, still using v{DATASET.version}: {e}")
+                return
+
+        await ctx.send(f"now using v{DATASET.version}: {len(ds.pets)} pets, {len(ds.talents)} talents")
 
 ## exceptions
 
@@ -650,16 +1632,20 @@ class PetCogException(commands.BadArgument):
         self.show_help = show_help
 
 class NotFoundError(PetCogException):
-    def __init__(self, message: str):
+    def __init__(self, message: str, *, suggestions: Sequence[str] = ()):
+        if suggestions:
+            *rest, last = [f'"{escape(s)}"' for s in suggestions]
+            message += f"\ndid you mean {', '.join(rest)} or {last}?" if rest else f"\ndid you mean {last}?"
         super().__init__(message, show_help=False)
+        self.suggestions = suggestions
 
 class PetNotFound(NotFoundError):
-    def __init__(self, argument: str):
-        super().__init__(f'dont know a pet like "{escape(argument)}"')
+    def __init__(self, argument: str, *, suggestions: Sequence[str] = ()):
+        super().__init__(f'dont know a pet like "{escape(argument)}"', suggestions=suggestions)
 
 class NoPetsFound(NotFoundError):
-    def __init__(self, argument: str):
-        super().__init__(f'no pets found for "{escape(argument)}"')
+    def __init__(self, argument: str, *, suggestions: Sequence[str] = ()):
+        super().__init__(f'no pets found for "{escape(argument)}"', suggestions=suggestions)
 
 class NotEnoughPets(PetCogException):
     def __init__(self, *, bound: int):
@@ -672,8 +1658,8 @@ class TooManyPets(PetCogException):
         super().__init__(f"only need {bound} {plural}")
 
 class TalentNotFound(NotFoundError):
-    def __init__(self, argument: str):
-        super().__init__(f'dont know a talent like "{escape(argument)}"')
+    def __init__(self, argument: str, *, suggestions: Sequence[str] = ()):
+        super().__init__(f'dont know a talent like "{escape(argument)}"', suggestions=suggestions)
 
 class NotEnoughTalents(PetCogException):
     def __init__(self, *, bound: int):
@@ -698,8 +1684,12 @@ class SchoolNotFound(NotFoundError):
         super().__init__(f'dont know a school like "{escape(argument)}"\ncan be any of this: {schools}')
 
 class EggNotFound(NotFoundError):
+    def __init__(self, argument: str, *, suggestions: Sequence[str] = ()):
+        super().__init__(f'dont know an egg like "{argument}"', suggestions=suggestions)
+
+class BadTalentWeight(PetCogException):
     def __init__(self, argument: str):
-        super().__init__(f'dont know an egg like "{argument}"')
+        super().__init__(f'"{escape(argument)}" needs a weight above 0 and up to {RECOMMEND_MAX_WEIGHT}')
 
 class BadPriorityStyle(PetCogException):
     def __init__(self):
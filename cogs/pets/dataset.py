@@ -0,0 +1,375 @@
+import bisect
+import datetime
+import heapq
+from operator import attrgetter
+from typing import Collection, Iterable
+
+from .search import FuzzyIndex, PrefixIndex, TrigramIndex
+from .types import Pet, PetData, Talent, TalentData
+
+
+# thx TTA/lntrn
+def pet_hatch_chance(a: int, b: int) -> float:
+    n = (11 - a) / (22 - (a + b))
+    return round(n * 100, 2)
+
+
+def set_bits(bits: int) -> list[int]:
+    """the positions of the set bits in bits, lowest first."""
+
+    # bits & -bits copies the whole int every time, so peeling them off one
+    # at a time is quadratic on a big one. bin() is a single pass and find
+    # skips the runs of zeros in c, so this is one pass plus the matches
+    digits = bin(bits)[:1:-1]
+    found: list[int] = []
+    index = digits.find("1")
+    while index != -1:
+        found.append(index)
+        index = digits.find("1", index + 1)
+    return found
+
+
+class PriorityIndex:
+    """talents sorted by one of the priority fields, split up by rarity and
+    by whether they're lockable. a range query is then a bisect into each
+    group that's wanted plus a merge of the slices, rather than a walk over
+    every talent."""
+
+    def __init__(self, talents: list[Talent], key: str):
+        self.key = key
+        self.priority = attrgetter(key)
+        # sorted() is stable so ties keep their order from talents.json
+        self.talents = sorted(talents, key=self.priority)
+        self.ranks = {talent.internal_name: rank for rank, talent in enumerate(self.talents)}
+
+        # (rarity, lockable) -> (priorities, ranks), both ascending
+        self.groups: dict[tuple[int, bool], tuple[list[int], list[int]]] = {}
+        for rank, talent in enumerate(self.talents):
+            (priorities, ranks) = self.groups.setdefault((talent.rarity, talent.unlocked is not None), ([], []))
+            priorities.append(self.priority(talent))
+            ranks.append(rank)
+
+    def sort(self, talents: Iterable[Talent]) -> list[Talent]:
+        return sorted(talents, key=lambda t: self.ranks[t.internal_name])
+
+    def between(
+        self,
+        below: Talent | None,
+        above: Talent | None,
+        *,
+        rarities: Collection[int] = (),
+        lockable: bool = True,
+    ) -> list[Talent]:
+        """talents with a priority from below's up to above's (inclusive).
+        below and above themselves are always included even if they dont
+        pass the filters."""
+
+        low = None if below is None else self.priority(below)
+        high = None if above is None else self.priority(above)
+
+        slices: list[list[int]] = []
+        for (rarity, is_lockable), (priorities, ranks) in self.groups.items():
+            if rarities and rarity not in rarities:
+                continue
+            if is_lockable and not lockable:
+                continue
+
+            start = 0 if low is None else bisect.bisect_left(priorities, low)
+            stop = len(priorities) if high is None else bisect.bisect_right(priorities, high)
+            if start < stop:
+                slices.append(ranks[start:stop])
+
+        found = list(heapq.merge(*slices))
+        for boundary in (below, above):
+            if boundary is None:
+                continue
+            rank = self.ranks[boundary.internal_name]
+            position = bisect.bisect_left(found, rank)
+            if position == len(found) or found[position] != rank:
+                found.insert(position, rank)
+
+        return [self.talents[rank] for rank in found]
+
+
+class Dataset:
+    """every lookup table and index derived from pets.json and talents.json.
+
+    building one is the slow part of startup so the whole thing gets
+    pickled into a snapshot, see snapshot.py.
+    """
+
+    def __init__(self, pets: list[PetData], talents: list[TalentData]):
+        # the raw json isnt kept around, only the records built from it
+        self.pets = [Pet(data) for data in pets]
+        self.talents = [Talent(data) for data in talents]
+
+        self.build_pets()
+        self.build_talents()
+        self.build_morphs()
+        self.build_bitsets()
+
+    def build_pets(self):
+        self.pets_by_lowercase_name = {pet.lower_name: pet for pet in self.pets}
+        self.pets_by_internal_name = {pet.internal_name: pet for pet in self.pets}
+        self.pets_by_name_trigrams = TrigramIndex(self.pets_by_lowercase_name)
+        self.pets_by_fuzzy_name = FuzzyIndex(self.pets_by_lowercase_name)
+        self.pets_by_prefix = PrefixIndex(self.pets_by_lowercase_name)
+
+        self.eggs = frozenset(pet.egg_key for pet in self.pets)
+        # people usually leave out the " egg" part
+        self.eggs_by_fuzzy_name = FuzzyIndex({egg.removesuffix(" egg"): egg for egg in self.eggs})
+        self.eggs_by_prefix = PrefixIndex({egg: egg for egg in sorted(self.eggs)})
+
+    def build_talents(self):
+        self.talents_by_internal_name = {talent.internal_name: talent for talent in self.talents}
+        self.talents_by_priority = PriorityIndex(self.talents, "priority")
+        self.talents_by_absolute_priority = PriorityIndex(self.talents, "absolute_priority")
+        self.talents_sorted_by_priority = self.talents_by_priority.talents
+
+        by_lowercase_name: dict[str, Talent] = {}
+
+        for talent in self.talents:
+            name = talent.lower_name
+
+            unlocked = talent.unlocked
+            if unlocked is not None:
+                variant = "unlocked" if unlocked else "locked"
+                # eg. frozen kraken trained
+                for alias in (
+                                              ## alias the following:
+                    f"{name} {variant}",   # unlocked frozen kraken trained
+                    f"{name} ({variant})", # frozen kraken trained unlocked
+                    f"{variant} {name}",   # frozen kraken trained (unlocked)
+                ):
+                    by_lowercase_name[alias] = talent
+
+            elif "-" in name:
+                # support writing talents with/without hyphens
+                # eg. death-dealer
+                by_hyphen = name.split("-")
+                for alias in (
+                    "".join(by_hyphen), # deathdealer
+                    " ".join(by_hyphen) # death dealer
+                ):
+                    by_lowercase_name[alias] = talent
+
+            elif "," in name:
+                # eg. no pain, no gain
+                # alias no pain no gain
+                by_lowercase_name[name.replace(",", "")] = talent
+
+            # i want 'frozen kraken trained' and others to always point to the
+            # locked variant when locked/unlocked is not explicitly written
+            if unlocked is None or not unlocked:
+                by_lowercase_name[name] = talent
+
+        # its very common for people to type spell defy instead of the full spell defying
+        # so ill just special case this one here
+        spell_defying = self.talents_by_internal_name["Talent-Resist-All01"]
+        for alias in ("spelldefy", "spell defy", "spell-defy"):
+            by_lowercase_name[alias] = spell_defying
+
+        self.talents_by_lowercase_name = by_lowercase_name
+        self.talents_by_fuzzy_name = FuzzyIndex(by_lowercase_name)
+        self.talents_by_prefix = PrefixIndex(by_lowercase_name)
+
+    @staticmethod
+    def parents(a: str, b: str) -> tuple[str, str]:
+        # hatching is symmetric so a pair of parents is always stored in
+        # the same order, whichever one was given first
+        return (a, b) if a <= b else (b, a)
+
+    def build_morphs(self):
+        # morphing exceptions are only listed on one of the two parents,
+        # eg. rain core lists clamoring ghulture (with ghulture as "other")
+        # but ghulture doesnt. keying on the sorted pair covers both sides
+        # in one pass, dicts are used as ordered sets to drop duplicates
+        babies: dict[tuple[str, str], dict[str, None]] = {}
+        partners: dict[str, dict[str, None]] = {}
+        parents: dict[str, dict[tuple[str, str], None]] = {}
+        listings: set[tuple[str, str]] = set()
+
+        for pet in self.pets:
+            a = pet.internal_name
+            for morph in pet.morphing_exceptions:
+                b = morph["other"]
+                babies.setdefault(self.parents(a, b), {})[morph["baby"]] = None
+                partners.setdefault(a, {})[b] = None
+                partners.setdefault(b, {})[a] = None
+                # unlike the pair keys this keeps which parent listed it
+                parents.setdefault(morph["baby"], {})[(a, b)] = None
+                listings.add((a, b))
+
+        # (parent, parent) -> babies, see parents() for the key order
+        self.babies_by_parents = {pair: tuple(found) for pair, found in babies.items()}
+        # parent -> every pet it has a hybrid with
+        self.partners_by_parent = {parent: tuple(found) for parent, found in partners.items()}
+        # baby -> (parent the exception is listed on, other parent)
+        self.parents_by_baby = {baby: tuple(found) for baby, found in parents.items()}
+        # (parent, other parent) for every parent that lists an exception
+        self.morph_listings = frozenset(listings)
+
+        self.hybrids = frozenset(baby for found in babies.values() for baby in found)
+        for pet in self.pets:
+            pet.hybrid = pet.internal_name in self.hybrids
+
+    def babies(self, a: Pet, b: Pet) -> list[Pet]:
+        """hybrids that a and b can hatch, in either order."""
+
+        found = self.babies_by_parents.get(self.parents(a.internal_name, b.internal_name), ())
+        return [self.pets_by_internal_name[baby] for baby in found]
+
+    def lists_morph(self, pet: Pet, other: Pet) -> bool:
+        """whether pet itself lists a morphing exception with other."""
+        return (pet.internal_name, other.internal_name) in self.morph_listings
+
+    def partners(self, pet: Pet) -> list[Pet]:
+        """pets that hatch a hybrid with pet."""
+
+        found = self.partners_by_parent.get(pet.internal_name, ())
+        return [self.pets_by_internal_name[partner] for partner in found]
+
+    def hatch_outcomes(self, a: Pet, b: Pet) -> dict[str, tuple[Pet, float]]:
+        """every baby a and b can hatch -> (baby, chance in %).
+
+        a hybrid comes out in place of the parent that lists the morphing
+        exception, so that parent's chance is split between the pair's hybrids.
+        """
+
+        babies = self.babies(a, b)
+        outcomes: dict[str, tuple[Pet, float]] = {}
+        for parent, other in ((a, b), (b, a)):
+            chance = pet_hatch_chance(parent.wow_factor, other.wow_factor)
+            if babies and self.lists_morph(parent, other):
+                (found, chance) = (babies, chance / len(babies))
+            else:
+                found = [parent]
+            for baby in found:
+                (_, before) = outcomes.get(baby.internal_name, (baby, 0.0))
+                outcomes[baby.internal_name] = (baby, before + chance)
+        return outcomes
+
+    def parents_of(self, baby: Pet) -> list[tuple[Pet, Pet]]:
+        """(parent, other parent) pairs that can hatch baby as a hybrid. the
+        first one is the parent that lists the morphing exception."""
+
+        found = self.parents_by_baby.get(baby.internal_name, ())
+        by_name = self.pets_by_internal_name
+        return [(by_name[a], by_name[b]) for a, b in found]
+
+    def build_bitsets(self):
+        # bit n of every index below is set when pets[n] has that attribute,
+        # so searching pets is just and-ing/or-ing ints together instead of
+        # checking every pet against every flag
+
+        self.all_pets = (1 << len(self.pets)) - 1
+
+        self.pet_bits_by_internal_name: dict[str, int] = {}
+        self.pet_bits_by_wow_factor: dict[int, int] = {}
+        self.pet_bits_by_rarity: dict[int, int] = {}
+        self.pet_bits_by_school: dict[str, int] = {}
+        self.pet_bits_by_egg: dict[str, int] = {}
+        # talents and abilities share one index since the talent flag searches both
+        self.pet_bits_by_talent: dict[str, int] = {}
+        self.pet_bits_by_spell: dict[str, int] = {}
+
+        # the other way around too: bit n of pool_bits[i] is set when pets[i]
+        # has talents_sorted_by_priority[n] in its pool, so the lowest bit of
+        # any of these is the highest priority talent in it
+        ranks = self.talents_by_priority.ranks
+        self.pool_bits: list[int] = []
+
+        exclusive = tradeable = hybrid = 0
+
+        for index, pet in enumerate(self.pets):
+            bit = 1 << index
+
+            self.pet_bits_by_internal_name[pet.internal_name] = bit
+
+            for bits, key in (
+                (self.pet_bits_by_wow_factor, pet.wow_factor),
+                (self.pet_bits_by_rarity, pet.rarity),
+                (self.pet_bits_by_school, pet.lower_school),
+                (self.pet_bits_by_egg, pet.egg_key),
+            ):
+                bits[key] = bits.get(key, 0) | bit
+
+            pool = 0
+            for key in pet.pool:
+                self.pet_bits_by_talent[key] = self.pet_bits_by_talent.get(key, 0) | bit
+                if talent := self.talents_by_lowercase_name.get(key):
+                    pool |= 1 << ranks[talent.internal_name]
+            self.pool_bits.append(pool)
+
+            for key in pet.lower_spells:
+                self.pet_bits_by_spell[key] = self.pet_bits_by_spell.get(key, 0) | bit
+
+            if pet.exclusive:
+                exclusive |= bit
+            if pet.tradeable:
+                tradeable |= bit
+            if pet.hybrid:
+                hybrid |= bit
+
+        (self.exclusive_pets, self.tradeable_pets, self.hybrid_pets) = (exclusive, tradeable, hybrid)
+
+    def recommend(self, wishlist: dict[Talent, float], *, limit: int) -> list[tuple[float, Pet, int]]:
+        """the limit pets whose pools cover the most of wishlist by weight,
+        as (score, pet, matched talents as pool bits). ties go to the pet
+        with the highest priority talent out of the ones matched.
+
+        only pets with at least one of the talents are scored."""
+
+        ranks = self.talents_by_priority.ranks
+        # talent rank -> weight
+        weights: dict[int, float] = {}
+        candidates = 0
+        for talent, weight in wishlist.items():
+            # locked/unlocked variants share a name, pools only know the name
+            talent = self.talents_by_lowercase_name.get(talent.lower_name, talent)
+            rank = ranks[talent.internal_name]
+            weights[rank] = weights.get(rank, 0.0) + weight
+            candidates |= self.pet_bits_by_talent.get(talent.lower_name, 0)
+
+        wanted = sum(1 << rank for rank in weights)
+
+        def scored():
+            for index in set_bits(candidates):
+                matched = self.pool_bits[index] & wanted
+                score = 0.0
+                for rank in set_bits(matched):
+                    score += weights[rank]
+                # lowest set bit is the best ranked talent, then pet order
+                yield (score, -(matched & -matched), -index, matched)
+
+        best = heapq.nlargest(limit, scored())
+        return [(score, self.pets[-negated], matched) for score, _, negated, matched in best]
+
+    def pets_to_bitset(self, pets: Iterable[Pet]) -> int:
+        bits = 0
+        for pet in pets:
+            bits |= self.pet_bits_by_internal_name[pet.internal_name]
+        return bits
+
+    def pets_from_bitset(self, bits: int) -> list[Pet]:
+        # one pass over the bits plus one step per match, see set_bits
+        pets = self.pets
+        return [pets[index] for index in set_bits(bits)]
+
+
+class DatasetRef:
+    """points at the dataset commands should be using right now.
+
+    reloading builds a whole new Dataset off to the side and swaps it in
+    with a single assignment, so anything that already grabbed the old one
+    just keeps using it until it's done.
+    """
+
+    def __init__(self, ds: Dataset):
+        self.version = 0
+        self.swap(ds)
+
+    def swap(self, ds: Dataset):
+        self.current = ds
+        self.version += 1
+        self.loaded_at = datetime.datetime.now(datetime.timezone.utc)
@@ -0,0 +1,59 @@
+"""chances of a pet's first gen talents manifesting.
+
+every time a pet grows up a stage (teen up to mega) it gets a shot at
+manifesting one more talent. each talent it hasnt manifested yet rolls
+against its rarity, and when several pass the one with the lowest priority
+wins, the same order they show up in-game. the game doesnt publish the
+actual rolls so ROLL_CHANCES is a guess, which is why simulate only
+shows the talents ranked by these and never the numbers themselves.
+"""
+
+import functools
+
+from .types import COMMON, EPIC, RARE, ULTRA_RARE, UNCOMMON
+
+# chance of a talent passing its roll on a level up
+ROLL_CHANCES = {
+    COMMON: 0.6,
+    UNCOMMON: 0.4,
+    RARE: 0.25,
+    ULTRA_RARE: 0.12,
+    EPIC: 0.05,
+}
+LEVEL_UPS = 5
+
+
+@functools.lru_cache(maxsize=1024)
+def manifest_chances(rarities: tuple[int, ...], level_ups: int = LEVEL_UPS) -> tuple[float, ...]:
+    """chance of each talent having manifested after every level up, for a
+    pool given as its talents' rarities in priority order.
+
+    worked out exactly over every set of already manifested talents, a pool
+    is only a handful of talents so that's a few dozen states at most. the
+    result only depends on the rarities, so pools that look the same share
+    one cached result even across different pets."""
+
+    rolls = [ROLL_CHANCES.get(rarity, 0.0) for rarity in rarities]
+
+    # bitmask of manifested talents -> chance of being there
+    states: dict[int, float] = {0: 1.0}
+    for _ in range(level_ups):
+        following: dict[int, float] = {}
+        for state, chance in states.items():
+            # chance that nothing before this talent (by priority) won
+            unclaimed = chance
+            for position, roll in enumerate(rolls):
+                if state >> position & 1:
+                    continue
+                won = unclaimed * roll
+                following[state | 1 << position] = following.get(state | 1 << position, 0.0) + won
+                unclaimed -= won
+            following[state] = following.get(state, 0.0) + unclaimed
+        states = following
+
+    chances = [0.0] * len(rolls)
+    for state, chance in states.items():
+        for position in range(len(rolls)):
+            if state >> position & 1:
+                chances[position] += chance
+    return tuple(chances)
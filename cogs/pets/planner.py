@@ -0,0 +1,229 @@
+"""multi-generation breeding planner.
+
+finds the fewest hatches that get a set of talents into one pet's pool,
+assuming a baby can inherit the pool of both of its parents. it's a best
+first search over (body, talents carried so far) states, and since it can
+take a while it runs in worker processes (see PetsCog.plan) which get the
+dataset handed to them once when they start.
+"""
+
+import heapq
+import itertools
+import time
+from typing import NamedTuple
+
+from .dataset import Dataset
+
+# every worker's copy of the dataset and the shared cancel flags, see init
+DATASET: Dataset | None = None
+CANCELLED = None
+
+# how often (in expanded states) the time budget and cancel flag are checked
+CHECK_EVERY = 256
+
+
+class Step(NamedTuple):
+    partner: str
+    # the body this step is hoping for and how likely it is (in %)
+    baby: str | None
+    chance: float
+    # bitmask over the targets carried after this step
+    carried: int
+
+
+class Plan(NamedTuple):
+    # "found", "exhausted", "timeout" or "cancelled"
+    status: str
+    start: str | None
+    # bitmask over the targets the start pet already has
+    carried: int
+    steps: tuple[Step, ...]
+    # chance of every hatch going the planned way, in %
+    chance: float
+    expansions: int
+
+
+def init(ds: Dataset, cancelled):
+    global DATASET, CANCELLED
+    (DATASET, CANCELLED) = (ds, cancelled)
+
+
+def ancestors(ds: Dataset, babies: set[str], depth: int) -> set[str]:
+    """babies, every pet that can hatch one of them as a hybrid, the ones
+    that can hatch those and so on, depth levels up."""
+
+    found = set(babies)
+    level = list(babies)
+    for _ in range(depth):
+        level = [
+            parent
+            for baby in level
+            for pair in ds.parents_by_baby.get(baby, ())
+            for parent in pair
+            if parent not in found
+        ]
+        found.update(level)
+    return found
+
+
+def partners_for_goal(ds: Dataset, goal: str, masks: dict[str, int], max_hatches: int) -> dict[tuple, str]:
+    """with a goal every pet matters, even ones carrying nothing since the
+    body still has to get to the goal. most of them are interchangeable
+    though:
+
+    - the goal, everything that can hatch towards it as a hybrid and
+      anything those have hybrids with are all kept by name.
+    - a pet without any hybrids only matters by what it carries and its
+      wow factor, so one of each is enough.
+    - any other pet's hybrids never lead to the goal, all they do is take
+      chance away from it and its partner. one without hybrids that
+      carries the same and has the same wow factor does just as well for
+      getting there, so it's only kept when there isnt one like that.
+
+    the last one can cost some chance, a hybrid that happens to be another
+    partner can be kept for sure by hatching it with itself, but keeping
+    every pet like that makes plans take seconds instead of milliseconds."""
+
+    named = ancestors(ds, {goal}, max_hatches)
+    named.update(partner for name in tuple(named) for partner in ds.partners_by_parent.get(name, ()))
+
+    partners: dict[tuple, str] = {}
+    hybrids: list[tuple[tuple, str]] = []
+    for pet in ds.pets:
+        name = pet.internal_name
+        key = (masks.get(name, 0), pet.wow_factor)
+        if name in named:
+            partners[(name,)] = name
+        elif name in ds.partners_by_parent:
+            hybrids.append((key, name))
+        else:
+            partners.setdefault(key, name)
+
+    for key, name in hybrids:
+        if key not in partners:
+            partners[(*key, name)] = name
+    return partners
+
+
+def search(
+    targets: tuple[str, ...],
+    goal: str | None,
+    *,
+    slot: int,
+    max_hatches: int,
+    budget: float,
+) -> Plan:
+    """plans hatches until every talent in targets (lowercase pool names)
+    is carried, ending on the goal pet's body when there is one.
+
+    states are ranked by hatches so far + the fewest hatches that could
+    still be needed, so the first finished plan has the fewest hatches. ties
+    go to the plan most likely to go the way it's written, out of the
+    partners partners_for_goal keeps."""
+
+    ds = DATASET
+    assert ds is not None and CANCELLED is not None
+
+    deadline = time.monotonic() + budget
+    full = (1 << len(targets)) - 1
+
+    masks: dict[str, int] = {}
+    for bit, target in enumerate(targets):
+        for pet in ds.pets_from_bitset(ds.pet_bits_by_talent.get(target, 0)):
+            masks[pet.internal_name] = masks.get(pet.internal_name, 0) | 1 << bit
+
+    reachable = 0
+    for mask in masks.values():
+        reachable |= mask
+    if reachable != full:
+        # some talent isnt in any pet's pool at all
+        return Plan("exhausted", None, 0, (), 0.0, 0)
+
+    # pets that carry the same talents are interchangeable as partners as
+    # long as they hatch the same way, see partners_for_goal for when there's a goal
+    partners: dict[tuple, str] = {}
+    if goal is None:
+        for name, mask in masks.items():
+            partners.setdefault((mask,), name)
+    else:
+        partners = partners_for_goal(ds, goal, masks, max_hatches)
+
+    widest = max(mask.bit_count() for mask in masks.values())
+
+    def estimate(body: str | None, carried: int) -> int:
+        missing = (full & ~carried).bit_count()
+        needed = -(-missing // widest)
+        if goal is not None and body != goal:
+            needed = max(needed, 1)
+        return needed
+
+    # without a goal pet the body never matters so it's left out of the state
+    State = tuple[str | None, int]
+    came_from: dict[State, tuple[State, Step] | str] = {}
+    best: dict[State, tuple[int, float]] = {}
+    heap: list[tuple[int, int, float, int, State]] = []
+    counter = itertools.count()
+
+    for name in partners.values():
+        state = (name if goal is not None else None, masks.get(name, 0))
+        if state not in best:
+            best[state] = (0, -1.0)
+            came_from[state] = name
+            heapq.heappush(heap, (estimate(*state), 0, -1.0, next(counter), state))
+
+    expansions = 0
+    while heap:
+        (_, hatches, negated, _, state) = heapq.heappop(heap)
+        if best.get(state, (hatches, negated)) < (hatches, negated):
+            continue
+
+        (body, carried) = state
+        if carried == full and (goal is None or body == goal):
+            return rebuild(state, came_from, -negated, expansions)
+
+        expansions += 1
+        if expansions % CHECK_EVERY == 0:
+            if CANCELLED[slot]:
+                return Plan("cancelled", None, 0, (), 0.0, expansions)
+            if time.monotonic() > deadline:
+                return Plan("timeout", None, 0, (), 0.0, expansions)
+
+        if hatches >= max_hatches:
+            continue
+
+        for name in partners.values():
+            gained = masks.get(name, 0) & ~carried
+            if goal is None:
+                if not gained:
+                    continue
+                outcomes = [(None, 100.0)]
+            else:
+                assert body is not None
+                outcomes = [
+                    (baby, chance)
+                    for baby, (_, chance) in ds.hatch_outcomes(
+                        ds.pets_by_internal_name[body], ds.pets_by_internal_name[name]
+                    ).items()
+                    if chance > 0
+                ]
+
+            for baby, chance in outcomes:
+                following = (baby, carried | gained)
+                cost = (hatches + 1, negated * chance / 100)
+                if cost >= best.get(following, (max_hatches + 1, 0.0)):
+                    continue
+                best[following] = cost
+                came_from[following] = (state, Step(name, baby, round(chance, 2), carried | gained))
+                heapq.heappush(heap, (cost[0] + estimate(*following), *cost, next(counter), following))
+
+    return Plan("exhausted", None, 0, (), 0.0, expansions)
+
+
+def rebuild(state: tuple[str | None, int], came_from: dict, chance: float, expansions: int) -> Plan:
+    steps: list[Step] = []
+    while True:
+        previous = came_from[state]
+        if isinstance(previous, str):
+            return Plan("found", previous, state[1], tuple(reversed(steps)), round(chance * 100, 2), expansions)
+        (state, step) = previous
+        steps.append(step)
@@ -0,0 +1,244 @@
+import bisect
+import heapq
+from collections import Counter
+from itertools import chain
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+def trigrams(string: str) -> set[str]:
+    return {string[i : i + 3] for i in range(len(string) - 2)}
+
+
+class TrigramIndex(Generic[T]):
+    """substring search over lowercase keys without scanning all of them.
+
+    every key is split into trigrams and each trigram maps to the (sorted)
+    positions of the keys containing it. a query only has to check the keys
+    under its rarest trigram, and results come back in the same order as
+    the mapping the index was built from.
+    """
+
+    def __init__(self, entries: dict[str, T]):
+        self.keys = list(entries)
+        self.values = list(entries.values())
+        self.postings: dict[str, list[int]] = {}
+
+        for position, key in enumerate(self.keys):
+            for trigram in trigrams(key):
+                self.postings.setdefault(trigram, []).append(position)
+
+    def search(self, substring: str) -> list[T]:
+        keys = self.keys
+        if len(substring) < 3:
+            # too short to have a trigram, these match a good chunk of
+            # everything anyway so theres not much to save here
+            return [self.values[i] for i, key in enumerate(keys) if substring in key]
+
+        candidates: list[int] | None = None
+        for trigram in trigrams(substring):
+            postings = self.postings.get(trigram)
+            if postings is None:
+                return []
+            if candidates is None or len(postings) < len(candidates):
+                candidates = postings
+
+        assert candidates is not None
+        # having every trigram doesnt mean they're in the right order
+        return [self.values[i] for i in candidates if substring in keys[i]]
+
+
+def edit_distance(a: str, b: str, bound: int) -> int:
+    """edit distance between a and b, counting swapped neighbours as one
+    typo. gives up with bound + 1 once it can only be over bound, and only
+    the diagonal band of width bound is ever filled in so this stays cheap
+    for the small bounds we use."""
+
+    (m, n) = (len(a), len(b))
+    over = bound + 1
+    if abs(m - n) > bound:
+        return over
+
+    before = [over] * (n + 1)
+    previous = [j if j <= bound else over for j in range(n + 1)]
+    previous_min = 0
+    for i in range(1, m + 1):
+        current = [over] * (n + 1)
+        if i <= bound:
+            current[0] = i
+
+        row_min = current[0]
+        char = a[i - 1]
+        for j in range(max(1, i - bound), min(n, i + bound) + 1):
+            cost = previous[j - 1] + (char != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            if (
+                i > 1 and j > 1
+                and char == b[j - 2] and a[i - 2] == b[j - 1]
+                and before[j - 2] + 1 < cost
+            ):
+                cost = before[j - 2] + 1
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+
+        # a swap can still reach back over one row
+        if row_min > bound and previous_min >= bound:
+            return over
+        (before, previous, previous_min) = (previous, current, row_min)
+
+    return min(previous[n], over)
+
+
+class FuzzyIndex(Generic[T]):
+    """typo tolerant lookup over lowercase keys.
+
+    keys sharing the most (padded) trigrams with the query are picked as
+    candidates first, and only those get a bounded edit distance, so a miss
+    never has to compare against every key.
+    """
+
+    CANDIDATES = 24
+
+    def __init__(self, entries: dict[str, T]):
+        self.keys = list(entries)
+        self.values = list(entries.values())
+        self.postings: dict[str, list[int]] = {}
+
+        for position, key in enumerate(self.keys):
+            for trigram in trigrams(self.pad(key)):
+                self.postings.setdefault(trigram, []).append(position)
+
+    @staticmethod
+    def pad(string: str) -> str:
+        # so that short keys and the start/end of keys still get trigrams
+        return f"  {string} "
+
+    @staticmethod
+    def bound(query: str) -> int:
+        # how many typos we put up with depends on how much was typed
+        size = len(query)
+        return 1 if size <= 4 else 2 if size <= 8 else 3
+
+    def search(
+        self, query: str, *, limit: int = 5, bound: int | None = None, exhaustive: bool = False
+    ) -> list[tuple[int, T]]:
+        """ranked (distance, value) pairs closest to query. values that
+        appear under several keys (eg. aliases) are only returned once.
+
+        only the CANDIDATES keys sharing the most trigrams are checked
+        unless exhaustive, which checks every key that could be within
+        bound. that's exact as long as the query has more than 4 * bound
+        trigrams, otherwise a key sharing none could still be close."""
+
+        postings = self.postings
+        grams = trigrams(self.pad(query))
+        shared = Counter(chain.from_iterable(postings.get(t, ()) for t in grams))
+
+        bound = self.bound(query) if bound is None else bound
+        # each typo can break at most 4 trigrams (a swap touches 4), anything
+        # sharing fewer than that can't be within bound so dont bother with it
+        least = len(grams) - 4 * bound
+        if exhaustive:
+            candidates = sorted(shared, key=shared.__getitem__, reverse=True)
+        else:
+            candidates = heapq.nlargest(self.CANDIDATES, shared, key=shared.__getitem__)
+
+        scored: list[tuple[int, int, int]] = []
+        for position in candidates:
+            if shared[position] < least:
+                break
+            distance = edit_distance(query, self.keys[position], bound)
+            if distance <= bound:
+                scored.append((distance, -shared[position], position))
+        scored.sort()
+
+        found: list[tuple[int, T]] = []
+        seen: set[int] = set()
+        for distance, _, position in scored:
+            value = self.values[position]
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+            found.append((distance, value))
+            if len(found) == limit:
+                break
+
+        return found
+
+    def closest(self, query: str) -> T | None:
+        """the value if query is exactly one typo away from a single key."""
+
+        if len(query) < 4:
+            return None
+
+        # exhaustive is cheap with a bound of 1 and a query this long, and
+        # it means a close key never loses out to ones sharing more trigrams
+        found = self.search(query, limit=2, bound=1, exhaustive=True)
+        if found and found[0][0] == 1 and (len(found) == 1 or found[1][0] > 1):
+            return found[0][1]
+        return None
+
+
+class PrefixIndex(Generic[T]):
+    """autocomplete over lowercase keys.
+
+    every key is stored sorted along with what's left of it after each
+    space, so "core" finds rain core too. everything starting with a prefix
+    is then one slice found with two bisects, no matter how many keys
+    there are.
+    """
+
+    def __init__(self, entries: dict[str, T]):
+        suffixes: list[tuple[str, int]] = []
+        self.values = list(entries.values())
+        for position, key in enumerate(entries):
+            start = 0
+            while True:
+                suffixes.append((key[start:], position))
+                start = key.find(" ", start) + 1
+                if not start:
+                    break
+
+        suffixes.sort()
+        self.keys = [key for key, _ in suffixes]
+        self.positions = [position for _, position in suffixes]
+
+    def complete(
+        self,
+        prefix: str,
+        *,
+        limit: int,
+        accept: Callable[[T], bool] | None = None,
+        score: Callable[[T], int] | None = None,
+    ) -> list[T]:
+        """up to limit values with a key (or word in one) starting with
+        prefix, highest score first and alphabetical otherwise. values
+        under several keys (eg. aliases) are only returned once."""
+
+        keys = self.keys
+        start = bisect.bisect_left(keys, prefix)
+        # nothing sorts after this so it's past every key starting with prefix
+        stop = bisect.bisect_left(keys, prefix + "\U0010ffff", lo=start)
+
+        found: list[T] = []
+        seen: set[int] = set()
+        for position in self.positions[start:stop]:
+            value = self.values[position]
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+            if accept is not None and not accept(value):
+                continue
+            found.append(value)
+            if score is None and len(found) == limit:
+                break
+
+        if score is None:
+            return found
+        # nsmallest is stable, so equal scores stay alphabetical
+        return heapq.nsmallest(limit, found, key=lambda value: -score(value))
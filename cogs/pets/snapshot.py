@@ -0,0 +1,126 @@
+"""versioned + checksummed pickle of the built Dataset.
+
+parsing the json and building every index takes a while, so the result
+gets written to SNAPSHOT_PATH and reused as long as the json (and the
+code that builds it) didn't change.
+
+the layout is:
+
+    MAGIC | version (u16) | source sha256 | payload sha256 | pickled Dataset
+
+build one ahead of time (eg. after pulling new resources) with:
+
+    python -m cogs.pets.snapshot
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import time
+from pathlib import Path
+
+from . import dataset, search, types
+from .dataset import Dataset
+
+LOGGER = logging.getLogger(__name__)
+
+# bump this when the snapshot layout changes
+SNAPSHOT_VERSION = 1
+MAGIC = b"GOBUPETS"
+HEADER = struct.Struct(f"<{len(MAGIC)}sH32s32s")
+
+SNAPSHOT_PATH = Path("cache/pets.snapshot")
+PETS_PATH = Path("resources/static/pets.json")
+TALENTS_PATH = Path("resources/static/talents.json")
+
+# a snapshot is only valid for the exact code that built it too
+CODE_PATHS = tuple(Path(module.__file__) for module in (dataset, search, types))  # type: ignore
+
+
+def source_hash(pets: bytes, talents: bytes) -> bytes:
+    digest = hashlib.sha256()
+    for blob in (pets, talents, *(path.read_bytes() for path in CODE_PATHS)):
+        digest.update(len(blob).to_bytes(8, "little"))
+        digest.update(blob)
+    return digest.digest()
+
+
+def build(pets: bytes, talents: bytes) -> Dataset:
+    return Dataset(json.loads(pets).get("pets", []), json.loads(talents))
+
+
+def read(path: Path, expected: bytes) -> Dataset | None:
+    try:
+        blob = path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+    if len(blob) < HEADER.size:
+        LOGGER.warning("pets snapshot %s is truncated, ignoring it", path)
+        return None
+
+    (magic, version, source, checksum) = HEADER.unpack_from(blob)
+    if magic != MAGIC or version != SNAPSHOT_VERSION:
+        LOGGER.info("pets snapshot %s is from another version, ignoring it", path)
+        return None
+    if source != expected:
+        LOGGER.info("pets snapshot %s is out of date, ignoring it", path)
+        return None
+
+    payload = memoryview(blob)[HEADER.size :]
+    if hashlib.sha256(payload).digest() != checksum:
+        LOGGER.warning("pets snapshot %s is corrupted, ignoring it", path)
+        return None
+
+    return pickle.loads(payload)
+
+
+def write(path: Path, ds: Dataset, source: bytes):
+    payload = pickle.dumps(ds, protocol=pickle.HIGHEST_PROTOCOL)
+    header = HEADER.pack(MAGIC, SNAPSHOT_VERSION, source, hashlib.sha256(payload).digest())
+
+    # write next to it then swap so a crash never leaves half a snapshot
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(".tmp")
+    with open(temporary, "wb") as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(temporary, path)
+
+
+def load(*, rebuild: bool = False) -> Dataset:
+    """loads the dataset from the snapshot if it's still valid, otherwise
+    builds it from the json and refreshes the snapshot."""
+
+    start = time.perf_counter()
+    pets = PETS_PATH.read_bytes()
+    talents = TALENTS_PATH.read_bytes()
+    source = source_hash(pets, talents)
+
+    if not rebuild:
+        ds = read(SNAPSHOT_PATH, source)
+        if ds is not None:
+            LOGGER.info("loaded pets dataset from snapshot in %.2fms", (time.perf_counter() - start) * 1e3)
+            return ds
+
+    ds = build(pets, talents)
+    built = time.perf_counter()
+    LOGGER.info("built pets dataset from json in %.2fms", (built - start) * 1e3)
+
+    try:
+        write(SNAPSHOT_PATH, ds, source)
+    except OSError:
+        # not being able to cache it isnt worth failing startup over
+        LOGGER.exception("could not write pets snapshot to %s", SNAPSHOT_PATH)
+    else:
+        LOGGER.info("wrote pets snapshot to %s in %.2fms", SNAPSHOT_PATH, (time.perf_counter() - built) * 1e3)
+
+    return ds
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    load(rebuild=True)
@@ -1,11 +1,13 @@
+import sys
 from typing import TypedDict
 
+## raw json shapes
 
 class MorphException(TypedDict):
     other: str
     baby: str
 
-class Pet(TypedDict):
+class PetData(TypedDict):
     name: str
     internal_name: str
     wow_factor: int
@@ -20,10 +22,146 @@ class Pet(TypedDict):
     spells: list[str]
     morphing_exceptions: list[MorphException]
 
-class Talent(TypedDict):
+class TalentData(TypedDict):
     name: str
     internal_name: str
     priority: int
     absolute_priority: int
     rarity: int
     unlocked: bool | None
+
+## constants
+# kept here rather than in static so that importing them (eg. in manifest)
+# doesnt load the dataset
+
+COMMON     = 1
+UNCOMMON   = 2
+RARE       = 3
+ULTRA_RARE = 4
+EPIC       = 5
+
+RARITIES: dict[str, int] = {
+    "common": COMMON,
+    "uncommon": UNCOMMON,
+    "rare": RARE,
+    "ultra-rare": ULTRA_RARE,
+    "epic": EPIC
+}
+
+SHORT_RARITIES: dict[int, str] = {
+    COMMON: "C",
+    UNCOMMON: "UC",
+    RARE: "R",
+    ULTRA_RARE: "UR",
+    EPIC: "E"
+}
+
+REVERSED_RARITIES: dict[int, str] = {value: key for key, value in RARITIES.items()}
+
+# for the error i want it to appear in this order
+ELEMENTALS = ["fire", "ice", "storm"]
+SPIRITS = ["life", "death", "myth"]
+SCHOOLS = frozenset(ELEMENTALS + SPIRITS)
+
+def pet_name_to_url(name: str) -> str:
+    # doesnt work for all pets
+    # for example some hybrid-type pets are suffixed with _(Hybrid)
+    # i cant do anything about this since i have no idea when the wiki does it
+    base = "https://www.wizard101central.com/wiki/Pet:"
+    return base + "_".join(name.split())
+
+def talent_name_to_url(name: str) -> str:
+    # likewise
+    base = "https://www.wizard101central.com/wiki/PetAbility:"
+    return base + "_".join(name.split())
+
+## records
+# the json gets turned into these once at load time so nothing has to
+# lowercase or rebuild anything per command. strings are interned since
+# the same talent/egg/school names are repeated across hundreds of pets
+
+class Pet:
+    __slots__ = (
+        "name",
+        "internal_name",
+        "wow_factor",
+        "exclusive",
+        "rarity",
+        "school",
+        "school_only",
+        "egg",
+        "talents",
+        "abilities",
+        "tradeable",
+        "spells",
+        "morphing_exceptions",
+
+        # precomputed
+        "lower_name",
+        "lower_school",
+        "egg_key",
+        "lower_spells",
+        "pool",
+        "url",
+        "hybrid",
+    )
+
+    def __init__(self, data: PetData):
+        self.name = sys.intern(data["name"])
+        self.internal_name = sys.intern(data["internal_name"])
+        self.wow_factor = data["wow_factor"]
+        self.exclusive = data["exclusive"]
+        self.rarity = data["rarity"]
+        self.school = sys.intern(data["school"])
+        self.school_only = data["school_only"]
+        self.egg = sys.intern(data["egg"])
+        self.talents = tuple(sys.intern(t) for t in data["talents"])
+        self.abilities = tuple(sys.intern(a) for a in data["abilities"])
+        self.tradeable = data["tradeable"]
+        self.spells = tuple(sys.intern(s) for s in data["spells"])
+        self.morphing_exceptions = [
+            MorphException(other=sys.intern(m["other"]), baby=sys.intern(m["baby"]))
+            for m in data["morphing_exceptions"]
+        ]
+
+        self.lower_name = sys.intern(self.name.lower())
+        self.lower_school = sys.intern(self.school.lower())
+        # eg. "rain core egg"
+        self.egg_key = sys.intern(self.egg.lower())
+        self.lower_spells = tuple(sys.intern(s.lower()) for s in self.spells)
+        # first gen talent + derby pool
+        self.pool = frozenset(sys.intern(t.lower()) for t in self.talents + self.abilities)
+        self.url = pet_name_to_url(self.name)
+        # filled in once every morphing exception is known
+        self.hybrid = False
+
+    def __repr__(self) -> str:
+        return f"<Pet internal_name={self.internal_name!r} name={self.name!r}>"
+
+class Talent:
+    __slots__ = (
+        "name",
+        "internal_name",
+        "priority",
+        "absolute_priority",
+        "rarity",
+        "unlocked",
+
+        # precomputed
+        "lower_name",
+        "url",
+    )
+
+    def __init__(self, data: TalentData):
+        self.name = sys.intern(data["name"])
+        self.internal_name = sys.intern(data["internal_name"])
+        self.priority = data["priority"]
+        self.absolute_priority = data["absolute_priority"]
+        self.rarity = data["rarity"]
+        self.unlocked = data["unlocked"]
+
+        self.lower_name = sys.intern(self.name.lower())
+        self.url = talent_name_to_url(self.name)
+
+    def __repr__(self) -> str:
+        return f"<Talent internal_name={self.internal_name!r} name={self.name!r}>"
@@ -1,13 +1,20 @@
 import inspect
+import io
 from typing import Any, Generator
 
 import discord
-from discord import ui
+from discord import app_commands, ui
 from discord.ext import commands
 
 import core
-from core import navi, utils
+from core import metrics, navi, profiler, utils
 
+# how many phases the metrics command lists
+METRICS_SHOWN = 15
+# how many functions the profile command lists
+PROFILE_SHOWN = 15
+# longest the profile command runs for, in seconds
+PROFILE_LIMIT = 300.0
 
 async def setup(bot: core.Gobu):
     await bot.add_cog(SelfCog(bot))
@@ -210,3 +217,77 @@ class SelfCog(core.Cog, name="Self", emoji="\N{GEAR}"):
 
     async def cog_unload(self):
         self.bot.help_command = self._original_help_command
+
+    @commands.group(name="metrics", invoke_without_command=True, hidden=True)
+    @commands.is_owner()
+    async def metrics_info(self, ctx: commands.Context):
+        """show where command time goes, with the full prometheus text attached."""
+
+        lines = [f"recording: {'on' if metrics.ENABLED else 'off'}"]
+        for phase, name, histogram in metrics.slowest(METRICS_SHOWN):
+            lines.append(
+                f"`{phase}` {name}: {histogram.count}x, {histogram.sum:.3f}s total,"
+                f" p50 <{histogram.quantile(0.5) * 1000:g}ms p99 <{histogram.quantile(0.99) * 1000:g}ms"
+            )
+
+        text = self.bot.render_metrics()
+        await ctx.send("\n".join(lines), file=discord.File(io.BytesIO(text.encode()), filename="metrics.txt"))
+
+    @metrics_info.command(name="on")
+    @commands.is_owner()
+    async def metrics_on(self, ctx: commands.Context):
+        """start recording latencies."""
+
+        metrics.ENABLED = True
+        await ctx.send("recording latencies")
+
+    @metrics_info.command(name="off")
+    @commands.is_owner()
+    async def metrics_off(self, ctx: commands.Context):
+        """stop recording latencies, whatever was recorded is kept."""
+
+        metrics.ENABLED = False
+        await ctx.send("stopped recording latencies")
+
+    @metrics_info.command(name="reset")
+    @commands.is_owner()
+    async def metrics_reset(self, ctx: commands.Context):
+        """forget every recorded latency."""
+
+        metrics.reset()
+        await ctx.send("forgot every recorded latency")
+
+    @commands.command(name="profile", hidden=True)
+    @commands.is_owner()
+    @commands.max_concurrency(1)
+    async def profile(self, ctx: commands.Context, seconds: commands.Range[float, 1.0, PROFILE_LIMIT] = 10.0):
+        """sample what the bot is doing for a while, with the collapsed stacks
+        attached for a flamegraph."""
+
+        if not profiler.supported():
+            await ctx.send("cant profile here, it needs setitimer and the event loop on the main thread")
+            return
+
+        await ctx.send(f"profiling for {seconds:g}s")
+        found = await profiler.profile(seconds)
+
+        lines = [
+            f"{found.samples} samples ({found.samples * profiler.INTERVAL:.2f}s of cpu) over {found.seconds:.1f}s,"
+            " own/total of our hottest functions:"
+        ]
+        for name, own, total in found.hottest(PROFILE_SHOWN):
+            lines.append(f"`{name}` {own / found.samples:.1%} / {total / found.samples:.1%}")
+        if len(lines) == 1:
+            lines.append("never caught any of our code running")
+
+        text = found.collapsed()
+        await ctx.send("\n".join(lines), file=discord.File(io.BytesIO(text.encode()), filename="profile.txt"))
+
+    @app_commands.command(name="help", description="shows this message.")
+    @app_commands.describe(command="a command or category to show help for.")
+    async def slash_help(self, interaction: discord.Interaction, command: str | None = None):
+        ctx = await commands.Context.from_interaction(interaction)
+        assert self.bot.help_command
+        cmd = self.bot.help_command.copy()
+        cmd.context = ctx
+        await cmd.command_callback(ctx, command=command)
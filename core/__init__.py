@@ -1,2 +1,3 @@
 from .bot import Gobu
 from .cog import Cog
+from .ratelimit import CooldownStore
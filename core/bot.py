@@ -1,55 +1,158 @@
+import asyncio
 import logging
 import re
+import time
 
 import discord
-from discord import app_commands
 from discord.ext import commands
 
+from . import metrics, navi
+from .ratelimit import CooldownStore
+from .watchdog import Watchdog, tag
+
 LOGGER = logging.getLogger(__name__)
 
+PREFIX = ">?"
+
+# how often the metrics textfile gets rewritten, in seconds
+METRICS_INTERVAL = 15.0
+
+
+def compile_message_filter(user_id: int) -> re.Pattern[str]:
+    """matches the start of any message that could be for us, either the
+    prefix or a mention. the bare group is set when it's only a mention."""
+
+    return re.compile(rf"{re.escape(PREFIX)}|<@!?{user_id}>(?P<bare>\Z)?")
+
 
 class Gobu(commands.Bot):
-    def __init__(self):
+    def __init__(
+        self,
+        *,
+        interactions_only: bool = False,
+        metrics_port: int | None = None,
+        metrics_textfile: str | None = None,
+        stall_threshold: float = 0.25,
+    ):
+        # without the message content intent discord only sends us the text
+        # of messages that mention us (and dms), so prefix commands only
+        # work through a mention and everything else goes through the slash
+        # commands, which have to be synced once (eg. jsk sync)
+        self.interactions_only = interactions_only
         intents = discord.Intents.default()
-        intents.message_content = True
+        intents.message_content = not interactions_only
         super().__init__(
-            command_prefix=commands.when_mentioned_or(">?"),
+            command_prefix=commands.when_mentioned_or(PREFIX),
             intents=intents,
             help_command=None,
             strip_after_prefix=True
         )
-        self.buckets: dict[int, app_commands.Cooldown] = {}
+        # replying to a bare mention, once per guild every 10s
+        self.mention_cooldowns: CooldownStore[int] = CooldownStore(1, 10.0)
 
-    async def on_message(self, message: discord.Message):
-        assert self.user
+        # built in setup_hook once we know our own id
+        self.message_filter: re.Pattern[str] | None = None
+        # how much of the gateway's MESSAGE_CREATEs were worth looking at
+        self.messages_accepted = 0
+        self.messages_rejected = 0
+
+        # either of these turns metrics on from the start, otherwise they
+        # can still be switched on with the metrics command
+        self.metrics_port = metrics_port
+        self.metrics_textfile = metrics_textfile
+        self.metrics_server: asyncio.Server | None = None
+        self.metrics_writer: asyncio.Task | None = None
+
+        # anything hogging the loop for longer than stall_threshold seconds
+        # gets logged with its stack
+        self.watchdog = Watchdog(threshold=stall_threshold)
 
-        if message.author.bot:
+    async def on_message(self, message: discord.Message):
+        # most messages arent for us, so throw those out before anything
+        # that costs more than a regex match
+        assert self.message_filter
+        match = self.message_filter.match(message.content)
+        if match is None or message.author.bot:
+            self.messages_rejected += 1
             return
+        self.messages_accepted += 1
+
         if message.guild:
             if not message.channel.permissions_for(message.guild.me).send_messages:
                 return
 
-        if re.fullmatch(rf"<@!?{self.user.id}>", message.content):
-            if message.guild:
-                key = message.guild.id
-                try:
-                    bucket = self.buckets[key]
-                except KeyError:
-                    self.buckets[key] = bucket = app_commands.Cooldown(1, 10.0)
-
-                remaining = bucket.update_rate_limit(message.created_at.timestamp())
-                if remaining:
-                    return
+        if match["bare"] is not None:
+            if message.guild and self.mention_cooldowns.hit(message.guild.id):
+                return
 
-            await message.reply(f'my prefix is `>?` or you can mention me')
+            if self.interactions_only:
+                await message.reply("use my slash commands, try `/help`")
+            else:
+                await message.reply(f"my prefix is `{PREFIX}` or you can mention me")
             return
 
         await self.process_commands(message)
 
+    async def on_interaction(self, interaction: discord.Interaction):
+        # persistent navi buttons dont have a view behind them, see core.navi
+        await navi.dispatch(interaction)
+
     async def setup_hook(self):
+        assert self.user
+        self.message_filter = compile_message_filter(self.user.id)
+
         for ext in ("jishaku", "cogs.pets", "cogs.self"):
             await self.load_extension(ext)
 
+        self.watchdog.start()
+
+        if self.metrics_port is not None or self.metrics_textfile is not None:
+            metrics.ENABLED = True
+        if self.metrics_port is not None:
+            self.metrics_server = await metrics.serve(self.render_metrics, port=self.metrics_port)
+        if self.metrics_textfile is not None:
+            self.metrics_writer = asyncio.create_task(self.write_metrics(self.metrics_textfile))
+
+    async def close(self):
+        self.watchdog.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+        if self.metrics_writer is not None:
+            self.metrics_writer.cancel()
+        await super().close()
+
+    async def invoke(self, ctx: commands.Context):
+        if ctx.command is not None:
+            tag(ctx.command.qualified_name)
+        if not metrics.ENABLED or ctx.command is None:
+            return await super().invoke(ctx)
+
+        start = time.perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            metrics.observe("command", ctx.command.qualified_name, time.perf_counter() - start)
+
+    def metric_samples(self) -> list[metrics.Sample]:
+        return [
+            ("gobu_messages_accepted_total", "counter", self.messages_accepted),
+            ("gobu_messages_rejected_total", "counter", self.messages_rejected),
+            ("gobu_mention_cooldowns", "gauge", len(self.mention_cooldowns)),
+            ("gobu_gateway_latency_seconds", "gauge", self.latency),
+            *self.watchdog.samples(),
+        ]
+
+    def render_metrics(self) -> str:
+        return metrics.render(self.metric_samples())
+
+    async def write_metrics(self, path: str):
+        while True:
+            try:
+                await asyncio.to_thread(metrics.write_textfile, path, self.render_metrics())
+            except OSError:
+                LOGGER.exception("couldnt write metrics to %s", path)
+            await asyncio.sleep(METRICS_INTERVAL)
+
     async def on_command_error(self, ctx: commands.Context, error: commands.CommandError):
         if isinstance(error, (commands.CommandInvokeError, commands.ConversionError)):
             assert ctx.command
@@ -0,0 +1,58 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """lru cache that also forgets entries once they're older than ttl
+    seconds. hits and misses are counted so it's possible to tell whether
+    it's actually pulling its weight."""
+
+    def __init__(self, maxsize: int, ttl: float, *, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        # key -> (expires at, value), least recently used first
+        self.entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: K) -> bool:
+        entry = self.entries.get(key)
+        return entry is not None and entry[0] > self.clock()
+
+    def get(self, key: K) -> V | None:
+        try:
+            (expires, value) = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        if expires <= self.clock():
+            del self.entries[key]
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: K, value: V):
+        self.entries[key] = (self.clock() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
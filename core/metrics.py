@@ -0,0 +1,189 @@
+"""latency histograms split up by phase (command, convert, search, render,
+send) and by name within a phase, eg. ("convert", "PetConverter").
+
+nothing is recorded unless ENABLED is set, and every hook checks it before
+doing anything else so a disabled sample is a few tenths of a microsecond.
+the numbers come out in the prometheus text format, either served on a
+local port, written to a textfile or through the metrics command.
+"""
+
+import asyncio
+import bisect
+import functools
+import os
+import time
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+ENABLED = False
+
+# upper bounds of the buckets in seconds, everything above the last one
+# lands in the +Inf bucket
+BUCKETS = (
+    0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0,
+)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """upper bound of the bucket the q quantile falls in, so an
+        overestimate by at most one bucket."""
+
+        wanted = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= wanted:
+                return bound
+        return float("inf")
+
+
+# (phase, name) -> histogram
+HISTOGRAMS: dict[tuple[str, str], Histogram] = {}
+
+def observe(phase: str, name: str, seconds: float):
+    try:
+        histogram = HISTOGRAMS[(phase, name)]
+    except KeyError:
+        histogram = HISTOGRAMS[(phase, name)] = Histogram()
+    histogram.observe(seconds)
+
+def reset():
+    HISTOGRAMS.clear()
+
+def slowest(limit: int) -> list[tuple[str, str, Histogram]]:
+    """the limit (phase, name, histogram)s that took the most time overall."""
+
+    ranked = sorted(HISTOGRAMS.items(), key=lambda item: item[1].sum, reverse=True)
+    return [(phase, name, histogram) for (phase, name), histogram in ranked[:limit]]
+
+
+class Timer:
+    __slots__ = ("phase", "name", "start")
+
+    def __init__(self, phase: str, name: str):
+        self.phase = phase
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *_):
+        observe(self.phase, self.name, time.perf_counter() - self.start)
+
+class NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *_):
+        pass
+
+NO_TIMER = NoTimer()
+
+def timer(phase: str, name: str) -> Timer | NoTimer:
+    """with timer(...): records how long the block took under (phase, name)."""
+    return Timer(phase, name) if ENABLED else NO_TIMER
+
+def timed(phase: str, name: str | None = None):
+    """timer for every call to a coroutine function. name defaults to the
+    class it's defined on, which is what you want for converters.
+
+    when disabled the wrapper hands back fn's own coroutine instead of
+    wrapping it in another one, so it's just one extra call."""
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        label = name or fn.__qualname__.rpartition(".")[0] or fn.__name__
+
+        async def record(start: float, coro: Awaitable[T]) -> T:
+            try:
+                return await coro
+            finally:
+                observe(phase, label, time.perf_counter() - start)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Awaitable[T]:
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            return record(time.perf_counter(), fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+## exporting
+
+# (metric name, "counter" or "gauge", value) for anything that isnt a latency
+Sample = tuple[str, str, float]
+
+def escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+def render(samples: Iterable[Sample] = ()) -> str:
+    lines = [
+        "# HELP gobu_latency_seconds time spent in each phase of handling a command",
+        "# TYPE gobu_latency_seconds histogram",
+    ]
+    for (phase, name), histogram in sorted(HISTOGRAMS.items()):
+        labels = f'phase="{escape(phase)}",name="{escape(name)}"'
+        cumulative = 0
+        for bound, count in zip(BUCKETS, histogram.counts):
+            cumulative += count
+            lines.append(f'gobu_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'gobu_latency_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"gobu_latency_seconds_sum{{{labels}}} {histogram.sum}")
+        lines.append(f"gobu_latency_seconds_count{{{labels}}} {histogram.count}")
+
+    for name, kind, value in samples:
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+
+    return "\n".join(lines) + "\n"
+
+def write_textfile(path: str, text: str):
+    # written off to the side and renamed so a scrape never sees half a file
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temporary, path)
+
+async def serve(text: Callable[[], str], *, port: int, host: str = "127.0.0.1") -> asyncio.Server:
+    """answers any http request on host:port with text(). it's only
+    meant for a local scraper so there's no routing at all."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = text().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                b"Content-Length: %d\r\n"
+                b"Connection: close\r\n\r\n" % len(body)
+            )
+            writer.write(body)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -1,18 +1,83 @@
-from typing import Any, Generic, TypeVar
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Generic, Sequence, TypeVar
 
 import discord
 from discord import ui
 from discord.ext import commands
 
+from . import metrics, watchdog
+
 ItemT = TypeVar("ItemT")
+EntryT = TypeVar("EntryT")
 
 # mini version of original navi
 
+class PageSource(Generic[ItemT]):
+    """renders pages when they're first looked at instead of all up front.
+    max_pages still has to be known so the last page button has a label."""
+
+    max_pages: int
+
+    def render(self, index: int) -> ItemT:
+        raise NotImplementedError
+
+class ListSource(PageSource[ItemT]):
+    """pages that were already rendered."""
+
+    def __init__(self, pages: Sequence[ItemT]):
+        self.pages = pages
+        self.max_pages = len(pages)
+
+    def render(self, index: int) -> ItemT:
+        return self.pages[index]
+
+class ChunkedSource(PageSource[ItemT], Generic[EntryT, ItemT]):
+    """splits entries into pages of per_page and formats a page with
+    formatter(entries on that page, index of the first one)."""
+
+    def __init__(
+        self,
+        entries: Sequence[EntryT],
+        formatter: Callable[[Sequence[EntryT], int], ItemT],
+        *,
+        per_page: int,
+    ):
+        self.entries = entries
+        self.formatter = formatter
+        self.per_page = per_page
+        self.max_pages = max(1, -(-len(entries) // per_page))
+
+    def render(self, index: int) -> ItemT:
+        start = index * self.per_page
+        return self.formatter(self.entries[start : start + self.per_page], start)
+
+class MemoSource(PageSource[ItemT]):
+    """keeps every page of source once it's been rendered, for sources
+    that get shared between messages (eg. cached responses)."""
+
+    def __init__(self, source: PageSource[ItemT]):
+        self.source = source
+        self.max_pages = source.max_pages
+        self.rendered: dict[int, ItemT] = {}
+
+    def render(self, index: int) -> ItemT:
+        try:
+            return self.rendered[index]
+        except KeyError:
+            page = self.rendered[index] = self.source.render(index)
+            return page
+
 class proxy(Generic[ItemT]):
-    def __init__(self, items: list[ItemT], *, index: int = 0):
-        self.items = items
-        self.index = index
-        self.max_pages = len(self.items)
+    def __init__(self, items: Sequence[ItemT] | PageSource[ItemT], *, index: int = 0, cache_size: int = 5):
+        self.source = items if isinstance(items, PageSource) else ListSource(items)
+        # int() since the index ends up in persistent custom_ids, where a
+        # stray bool would come out as "False"
+        self.index = int(index)
+        self.max_pages = self.source.max_pages
+        # only a handful of pages are kept around, most people never get
+        # past the first one anyway
+        self.cache_size = cache_size
+        self.rendered: OrderedDict[int, ItemT] = OrderedDict()
 
     def jump_first(self):
         self.index = 0
@@ -21,7 +86,15 @@ class proxy(Generic[ItemT]):
         self.index = max(self.index - 1, 0)
 
     def peek(self) -> ItemT:
-        return self.items[self.index]
+        try:
+            page = self.rendered[self.index]
+        except KeyError:
+            page = self.rendered[self.index] = self.source.render(self.index)
+            if len(self.rendered) > self.cache_size:
+                self.rendered.popitem(last=False)
+        else:
+            self.rendered.move_to_end(self.index)
+        return page
 
     def next(self):
         self.index = min(self.index + 1, self.max_pages - 1)
@@ -31,6 +104,14 @@ class proxy(Generic[ItemT]):
 
 VS15 = "\N{VARIATION SELECTOR-15}"
 
+FIRST_LABEL = f"1 \N{BLACK LEFT-POINTING DOUBLE TRIANGLE}{VS15}"
+PREVIOUS_LABEL = f"\N{BLACK LEFT-POINTING TRIANGLE}{VS15}"
+NEXT_LABEL = f"\N{BLACK RIGHT-POINTING TRIANGLE}{VS15}"
+CLOSE_LABEL = f"\N{EJECT SYMBOL}{VS15} Close pages"
+
+def last_label(max_pages: int) -> str:
+    return f"\N{BLACK RIGHT-POINTING DOUBLE TRIANGLE}{VS15} {max_pages}"
+
 class Navi(ui.View, Generic[ItemT]):
     def __init_subclass__(cls, *, navi_row: int | None = None):
         super().__init_subclass__()
@@ -62,13 +143,13 @@ class Navi(ui.View, Generic[ItemT]):
             prepped["content"] = item
         return prepped
 
-    @ui.button(label=f"1 \N{BLACK LEFT-POINTING DOUBLE TRIANGLE}{VS15}")
+    @ui.button(label=FIRST_LABEL)
     async def jump_first(self, interaction: discord.Interaction, button: ui.Button):
         self.proxy.jump_first()
         self.update_items()
         await interaction.response.edit_message(**self.prepare(self.proxy.peek()))
 
-    @ui.button(label=F"\N{BLACK LEFT-POINTING TRIANGLE}{VS15}")
+    @ui.button(label=PREVIOUS_LABEL)
     async def previous(self, interaction: discord.Interaction, button: ui.Button):
         self.proxy.previous()
         self.update_items()
@@ -77,7 +158,7 @@ class Navi(ui.View, Generic[ItemT]):
     @ui.button(style=discord.ButtonStyle.blurple, disabled=True)
     async def page_number(self, interaction: discord.Interaction, button: ui.Button): ...
 
-    @ui.button(label=f"\N{BLACK RIGHT-POINTING TRIANGLE}{VS15}")
+    @ui.button(label=NEXT_LABEL)
     async def next(self, interaction: discord.Interaction, button: ui.Button):
         self.proxy.next()
         self.update_items()
@@ -89,7 +170,7 @@ class Navi(ui.View, Generic[ItemT]):
         self.update_items()
         await interaction.response.edit_message(**self.prepare(self.proxy.peek()))
 
-    @ui.button(label=f"\N{EJECT SYMBOL}{VS15} Close pages", style=discord.ButtonStyle.red)
+    @ui.button(label=CLOSE_LABEL, style=discord.ButtonStyle.red)
     async def close(self, interaction: discord.Interaction, button: ui.Button):
         await interaction.response.defer(ephemeral=True)
         await interaction.delete_original_response()
@@ -98,9 +179,147 @@ class Navi(ui.View, Generic[ItemT]):
         self.jump_first.disabled = self.previous.disabled = self.proxy.index == 0
         self.page_number.label = str(self.proxy.index + 1)
         self.jump_last.disabled = self.next.disabled = self.proxy.index == (self.proxy.max_pages - 1)
-        self.jump_last.label = f"\N{BLACK RIGHT-POINTING DOUBLE TRIANGLE}{VS15} {self.proxy.max_pages}"
+        self.jump_last.label = last_label(self.proxy.max_pages)
+
+    async def send(self, ctx: commands.Context, *, persistent: tuple[str, str] | None = None, **extras: Any):
+        """persistent is a (kind, query) pair registered with register().
+        when given, the buttons carry the page/owner/query themselves and
+        this view is dropped as soon as the message is out, so nothing is
+        kept per message and the buttons still work after a restart.
+        queries too long to fit in a custom_id fall back to the normal
+        in-memory view."""
 
-    async def send(self, ctx: commands.Context, **extras: Any):
         self.owner_id = ctx.author.id
+        name = ctx.command.qualified_name if ctx.command else "navi"
+        with metrics.timer("render", name):
+            page = self.proxy.peek()
+
+        if persistent is not None and self.proxy.max_pages > 1:
+            (kind, query) = persistent
+            view = PersistentView(kind, self.owner_id, query, self.proxy.index, self.proxy.max_pages)
+            if view.fits():
+                prepped = self.prepare(page)
+                prepped["view"] = view
+                self.stop()
+                with metrics.timer("send", name):
+                    await ctx.send(**prepped, **extras)
+                return
+
         self.update_items()
-        await ctx.send(**self.prepare(self.proxy.peek()), **extras)
+        with metrics.timer("send", name):
+            await ctx.send(**self.prepare(page), **extras)
+
+## persistent mode
+# every button's custom_id looks like
+#
+#   navi:<kind>:<owner id>:<page>:<action>:<query>
+#
+# and a click rebuilds the source for kind from query (through whatever
+# registered it) then renders the single page that was asked for. the
+# action is only there to keep custom_ids unique within a message, eg. the
+# first and previous buttons both point at page 0 when on page 1.
+
+CUSTOM_ID_PREFIX = "navi"
+CUSTOM_ID_LIMIT = 100
+
+SourceBuilder = Callable[[discord.Interaction, str], Awaitable[PageSource[Any]]]
+
+SOURCES: dict[str, SourceBuilder] = {}
+
+def register(kind: str, builder: SourceBuilder):
+    if ":" in kind:
+        raise ValueError(f"navi kind {kind!r} cant contain a colon")
+    SOURCES[kind] = builder
+
+def unregister(kind: str):
+    SOURCES.pop(kind, None)
+
+def custom_id(kind: str, owner_id: int, page: int, action: str, query: str) -> str:
+    return f"{CUSTOM_ID_PREFIX}:{kind}:{owner_id}:{page}:{action}:{query}"
+
+def parse_custom_id(custom_id: str) -> tuple[str, int, int, str, str] | None:
+    parts = custom_id.split(":", 5)
+    if len(parts) != 6 or parts[0] != CUSTOM_ID_PREFIX:
+        return None
+    (_, kind, owner_id, page, action, query) = parts
+    try:
+        return (kind, int(owner_id), int(page), action, query)
+    except ValueError:
+        return None
+
+class PersistentView(ui.View):
+    """same buttons as Navi but without any callbacks, they're handled by
+    dispatch() instead. never stored by discord.py since it's stopped
+    before it's sent."""
+
+    def __init__(self, kind: str, owner_id: int, query: str, index: int, max_pages: int):
+        super().__init__(timeout=None)
+        index = int(index)
+        last = max_pages - 1
+        for action, page, label, style, disabled in (
+            ("f", 0, FIRST_LABEL, discord.ButtonStyle.grey, index == 0),
+            ("p", max(index - 1, 0), PREVIOUS_LABEL, discord.ButtonStyle.grey, index == 0),
+            ("i", index, str(index + 1), discord.ButtonStyle.blurple, True),
+            ("n", min(index + 1, last), NEXT_LABEL, discord.ButtonStyle.grey, index == last),
+            ("l", last, last_label(max_pages), discord.ButtonStyle.grey, index == last),
+            ("x", index, CLOSE_LABEL, discord.ButtonStyle.red, False),
+        ):
+            self.add_item(ui.Button(
+                label=label,
+                style=style,
+                disabled=disabled,
+                custom_id=custom_id(kind, owner_id, page, action, query),
+            ))
+        self.stop()
+
+    def fits(self) -> bool:
+        return all(
+            len(item.custom_id) <= CUSTOM_ID_LIMIT
+            for item in self.children
+            if isinstance(item, ui.Button) and item.custom_id
+        )
+
+async def dispatch(interaction: discord.Interaction) -> bool:
+    """handles a click on a persistent navi button. returns False when the
+    interaction wasnt one."""
+
+    if interaction.type is not discord.InteractionType.component or interaction.data is None:
+        return False
+    parsed = parse_custom_id(interaction.data.get("custom_id", ""))
+    if parsed is None:
+        return False
+
+    (kind, owner_id, page, action, query) = parsed
+    watchdog.tag(f"navi {kind}")
+    if interaction.user.id != owner_id:
+        # same as Navi.interaction_check failing
+        return True
+
+    if action == "x":
+        await interaction.response.defer(ephemeral=True)
+        await interaction.delete_original_response()
+        return True
+
+    builder = SOURCES.get(kind)
+    if builder is None:
+        await interaction.response.send_message("these pages cant be flipped anymore", ephemeral=True)
+        return True
+
+    try:
+        source = await builder(interaction, query)
+    except commands.CommandError as e:
+        # eg. a pet in the query was removed by a dataset reload
+        await interaction.response.send_message(f"couldnt rebuild these pages: {e}", ephemeral=True)
+        return True
+
+    # the results might have shrunk since the buttons were made
+    index = max(0, min(page, source.max_pages - 1))
+    prepped: dict[str, Any] = {"view": PersistentView(kind, owner_id, query, index, source.max_pages)}
+    item = source.render(index)
+    if isinstance(item, discord.Embed):
+        prepped["embed"] = item
+    elif isinstance(item, str):
+        prepped["content"] = item
+
+    await interaction.response.edit_message(**prepped)
+    return True
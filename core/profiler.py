@@ -0,0 +1,100 @@
+"""a sampling profiler for the running bot, no restart or tooling needed.
+
+a SIGPROF timer interrupts the process every INTERVAL of cpu time and the
+handler counts the stack it interrupted. the handler runs between
+bytecodes of the main thread, where the event loop lives, so it sees
+whatever python was actually running. a thread polling the stack instead
+would only ever get the gil when the loop gives it up, which is nearly
+always while it's idling in select. waiting on the network uses no cpu so
+it doesnt get sampled at all, this only shows where cpu goes.
+
+the result comes out in the collapsed stack format (one "a;b;c count" line
+per stack) that flamegraph.pl, speedscope and friends all read.
+"""
+
+import asyncio
+import signal
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+# seconds of cpu time between samples
+INTERVAL = 0.005
+# what counts as our code in the summary
+OURS = ("cogs.", "core.")
+
+Stack = tuple[str, ...]
+
+
+def label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_qualname}"
+
+
+def walk(frame: FrameType | None) -> Stack:
+    # outermost first, like the collapsed format wants
+    labels: list[str] = []
+    while frame is not None:
+        labels.append(label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels)
+
+
+class Profile:
+    def __init__(self, stacks: Counter[Stack], seconds: float):
+        self.stacks = stacks
+        self.samples = sum(stacks.values())
+        self.seconds = seconds
+
+    def collapsed(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def hottest(self, limit: int, *, prefixes: tuple[str, ...] = OURS) -> list[tuple[str, int, int]]:
+        """the limit (function, own, total) sample counts of our functions
+        with the highest total. own counts a sample against the innermost of
+        our functions on the stack, so time spent in discord.py or the
+        stdlib on our behalf goes to whatever of ours called it."""
+
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            ours = [name for name in stack if name.startswith(prefixes)]
+            if not ours:
+                continue
+            own[ours[-1]] += count
+            # recursion only counts once per sample
+            for name in set(ours):
+                total[name] += count
+
+        return [(name, own[name], count) for name, count in total.most_common(limit)]
+
+
+def supported() -> bool:
+    # no itimers on windows, and signal handlers only run on the main thread
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+async def profile(seconds: float, *, interval: float = INTERVAL) -> Profile:
+    """samples the process for seconds of wall time. see supported, this
+    raises RuntimeError otherwise."""
+
+    if not supported():
+        raise RuntimeError("profiling needs setitimer and the event loop on the main thread")
+
+    stacks: Counter[Stack] = Counter()
+
+    def handler(signum: int, frame: FrameType | None):
+        stacks[walk(frame)] += 1
+
+    previous = signal.signal(signal.SIGPROF, handler)
+    start = time.perf_counter()
+    signal.setitimer(signal.ITIMER_PROF, interval, interval)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, previous)
+
+    return Profile(stacks, time.perf_counter() - start)
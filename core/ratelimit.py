@@ -0,0 +1,95 @@
+import heapq
+import itertools
+import time
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class CooldownStore(Generic[K]):
+    """fixed window rate limits (rate uses every per seconds) for any key,
+    eg. a guild, user or channel id.
+
+    unlike a dict of Cooldowns this forgets keys once their window is over,
+    so it only ever holds keys that were used in the last per seconds (and
+    never more than maxsize of them). windows are also pushed onto a heap
+    by when they end so the expired ones can be dropped without a scan.
+    """
+
+    def __init__(
+        self,
+        rate: int,
+        per: float,
+        *,
+        maxsize: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.per = per
+        self.maxsize = maxsize
+        self.clock = clock
+        # key -> [window ends at, uses left in it]
+        self.windows: dict[K, list] = {}
+        # (window ends at, tiebreak, key), can have stale entries for
+        # windows that were replaced, those are skipped when they come up.
+        # the tiebreak keeps keys from ever being compared, they only have
+        # to be hashable
+        self.expiring: list[tuple[float, int, K]] = []
+        self.counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def __repr__(self) -> str:
+        return f"<CooldownStore rate={self.rate} per={self.per} size={len(self)}/{self.maxsize}>"
+
+    def purge(self, now: float | None = None):
+        """drops every window that's over."""
+
+        now = self.clock() if now is None else now
+        expiring = self.expiring
+        windows = self.windows
+        while expiring and expiring[0][0] <= now:
+            (ends, _, key) = heapq.heappop(expiring)
+            window = windows.get(key)
+            if window is not None and window[0] == ends:
+                del windows[key]
+
+    def hit(self, key: K) -> float:
+        """uses up one of key's uses. returns how long until key can be
+        used again if it's on cooldown, otherwise 0."""
+
+        now = self.clock()
+        self.purge(now)
+
+        window = self.windows.get(key)
+        if window is None:
+            if len(self.windows) >= self.maxsize:
+                self.evict()
+            ends = now + self.per
+            self.windows[key] = [ends, self.rate - 1]
+            heapq.heappush(self.expiring, (ends, next(self.counter), key))
+            return 0.0
+
+        if window[1] <= 0:
+            return window[0] - now
+        window[1] -= 1
+        return 0.0
+
+    def get_retry_after(self, key: K) -> float:
+        """same as hit without using anything up."""
+
+        window = self.windows.get(key)
+        if window is None or window[1] > 0:
+            return 0.0
+        return max(window[0] - self.clock(), 0.0)
+
+    def evict(self):
+        # full up with windows that are all still going, forget whichever
+        # one ends soonest
+        while self.expiring:
+            (ends, _, key) = heapq.heappop(self.expiring)
+            window = self.windows.get(key)
+            if window is not None and window[0] == ends:
+                del self.windows[key]
+                return
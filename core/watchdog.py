@@ -0,0 +1,145 @@
+"""keeps an eye on the event loop from the outside.
+
+a heartbeat task on the loop wakes up every INTERVAL and records how late
+it was, that's the loop lag. a thread off the loop checks on the heartbeat
+and when it's been stuck for longer than the threshold, whatever is
+running on the loop right now is the culprit, so it grabs the loop
+thread's stack and the command that task was handling (see tag). once the
+loop gets going again the heartbeat logs the stall with its full length.
+
+lag goes into the ("loop", "lag") histogram and stalls into ("stall",
+<command>), both only while metrics are enabled, the counters on Watchdog
+are always kept.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+
+from . import metrics
+
+LOGGER = logging.getLogger(__name__)
+
+# how often the heartbeat wakes up, in seconds
+INTERVAL = 0.05
+# innermost frames kept of a stall's stack
+STACK_LIMIT = 30
+
+# task -> what it's handling, filled in by tag
+TAGS: weakref.WeakKeyDictionary[asyncio.Task, str] = weakref.WeakKeyDictionary()
+
+
+def tag(name: str):
+    """marks the running task as handling name so a stall in it can be
+    blamed on it. untagged tasks show up as their task name."""
+
+    task = asyncio.current_task()
+    if task is not None:
+        TAGS[task] = name
+
+
+def blame(loop: asyncio.AbstractEventLoop) -> str:
+    # reading another thread's loop state isnt locked, but the worst we get
+    # is a task that just finished, which is close enough for a log line
+    task = asyncio.current_task(loop)
+    if task is None:
+        return "(no task)"
+    return TAGS.get(task) or task.get_name()
+
+
+class Stall:
+    __slots__ = ("command", "stack")
+
+    def __init__(self, command: str, stack: list[str]):
+        self.command = command
+        self.stack = stack
+
+
+class Watchdog:
+    def __init__(self, *, threshold: float = 0.25):
+        self.threshold = threshold
+        self.stalls = 0
+        self.worst_lag = 0.0
+
+        self.beat = time.monotonic()
+        # set by the thread while the loop is stuck, picked up by the heartbeat
+        self.stall: Stall | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.loop_thread: int | None = None
+        self.heartbeat: asyncio.Task | None = None
+        self.stopped = threading.Event()
+
+    def __repr__(self) -> str:
+        return f"<Watchdog threshold={self.threshold} stalls={self.stalls}>"
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self.beat = time.monotonic()
+        self.stopped.clear()
+        self.heartbeat = asyncio.create_task(self.run_heartbeat(), name="watchdog heartbeat")
+        threading.Thread(target=self.watch, name="watchdog", daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.heartbeat is not None:
+            self.heartbeat.cancel()
+
+    async def run_heartbeat(self):
+        while True:
+            await asyncio.sleep(INTERVAL)
+            now = time.monotonic()
+            lag = max(0.0, now - self.beat - INTERVAL)
+            self.beat = now
+
+            if lag > self.worst_lag:
+                self.worst_lag = lag
+            if metrics.ENABLED:
+                metrics.observe("loop", "lag", lag)
+
+            stall = self.stall
+            self.stall = None
+            if lag <= self.threshold:
+                continue
+
+            self.stalls += 1
+            command = stall.command if stall is not None else "(unknown)"
+            if metrics.ENABLED:
+                metrics.observe("stall", command, lag)
+            if stall is None:
+                # it was over before the thread got to look at it
+                LOGGER.warning("event loop was blocked for %.0fms, missed the stack", lag * 1e3)
+            else:
+                LOGGER.warning(
+                    "event loop was blocked for %.0fms by %s\n%s",
+                    lag * 1e3, command, "".join(stall.stack).rstrip(),
+                )
+
+    def watch(self):
+        assert self.loop is not None and self.loop_thread is not None
+        caught = None
+        while not self.stopped.wait(self.threshold / 2):
+            beat = self.beat
+            # one sample per stall, taken as soon as it's over the threshold.
+            # the heartbeat is only due INTERVAL after the last beat
+            if beat == caught or time.monotonic() - beat <= self.threshold + INTERVAL:
+                continue
+
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                # the loop thread is gone
+                return
+            stack = traceback.format_stack(frame, limit=STACK_LIMIT)
+            del frame
+            self.stall = Stall(blame(self.loop), stack)
+            caught = beat
+
+    def samples(self) -> list[metrics.Sample]:
+        return [
+            ("gobu_loop_stalls_total", "counter", self.stalls),
+            ("gobu_loop_worst_lag_seconds", "gauge", self.worst_lag),
+        ]
@@ -0,0 +1,29 @@
+"""cogs.pets.static loads the dataset from resources/ the first time it's
+imported, so anything that needs the cog gets it through pets_cog, which
+imports it from a directory with the toy json written into it.
+"""
+
+import importlib
+import json
+import os
+import random
+
+import pytest
+
+from tests.toy import toy_pets, toy_talents
+
+
+@pytest.fixture(scope="session")
+def pets_cog(tmp_path_factory: pytest.TempPathFactory):
+    root = tmp_path_factory.mktemp("pets")
+    (root / "resources" / "static").mkdir(parents=True)
+    pets = toy_pets(random.Random(0), 120)
+    (root / "resources" / "static" / "pets.json").write_text(json.dumps({"pets": pets}))
+    (root / "resources" / "static" / "talents.json").write_text(json.dumps(toy_talents()))
+
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        return importlib.import_module("cogs.pets.cog")
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+
+class Context:
+    """just what flag conversion uses of a commands.Context."""
+
+    def __init__(self, ds):
+        self.pets_dataset = ds
+        self.command = self.current_parameter = None
+
+
+@pytest.fixture
+def invoked(pets_cog, monkeypatch: pytest.MonkeyPatch):
+    # the queries the slash commands would have invoked their prefix command with
+    queries: list[str] = []
+
+    async def invoke_as(self, interaction, name: str, query: str):
+        queries.append(query)
+
+    monkeypatch.setattr(pets_cog.PetsCog, "invoke_as", invoke_as)
+    return queries
+
+
+def test_completed_talents_come_back_as_the_same_talent(pets_cog, invoked: list[str]):
+    ds = pets_cog.DATASET.current
+    cog = pets_cog.PetsCog(None)
+    # the toy data has no pain, no gain and both frozen kraken variants
+    talents = list(ds.talents_by_internal_name.values())
+
+    async def run():
+        for talent in talents:
+            # what gets typed before picking a choice never has its own comma
+            prefix = talent.lower_name.split(",")[0]
+            for typed in (prefix[:4], f"mighty, {prefix}"):
+                choices = await cog.complete_talents(None, typed)
+                # the same order the completer got them in
+                (before, _, current) = typed.rpartition(",")
+                completed = ds.talents_by_prefix.complete(
+                    current.strip(), limit=pets_cog.AUTOCOMPLETE_SIZE,
+                    score=lambda talent: pets_cog.POPULAR_TALENTS[talent.internal_name],
+                )
+                assert len(choices) == len(completed)
+
+                for choice, expected in zip(choices, completed):
+                    wanted = [ds.talents_by_lowercase_name["mighty"]] if before else []
+                    wanted.append(expected)
+
+                    await pets_cog.PetsCog.slash_pets.callback(cog, None, talents=choice.value)
+                    flags = await pets_cog.PetSearchFlags.convert(Context(ds), invoked.pop())
+                    assert flags.talent == wanted, choice
+
+                    if before and expected is not wanted[0]:
+                        await pets_cog.PetsCog.slash_talents.callback(cog, None, between=choice.value)
+                        flags = await pets_cog.TalentSearchFlags.convert(Context(ds), invoked.pop())
+                        assert flags.between == wanted, choice
+
+    assert any("," in talent.name for talent in talents)
+    asyncio.run(run())
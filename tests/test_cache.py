@@ -0,0 +1,61 @@
+import random
+
+from core.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire():
+    clock = Clock()
+    cache: TTLCache[str, int] = TTLCache(10, 5.0, clock=clock)
+    cache.put("a", 1)
+    clock.now = 4.9
+    assert "a" in cache and cache.get("a") == 1
+    clock.now = 5.0
+    assert "a" not in cache and cache.get("a") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_goes_first():
+    cache: TTLCache[str, int] = TTLCache(2, 60.0, clock=Clock())
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_agrees_with_a_naive_model():
+    rng = random.Random(0)
+    clock = Clock()
+    cache: TTLCache[int, int] = TTLCache(8, 10.0, clock=clock)
+    # key -> (expires at, value, last touched)
+    model: dict[int, tuple[float, int, int]] = {}
+
+    for tick in range(20_000):
+        clock.now += rng.choice([0.0, 0.5, 1.0, 3.0])
+        key = rng.randrange(16)
+        if rng.random() < 0.5:
+            model[key] = (clock.now + 10.0, tick, tick)
+            if len(model) > 8:
+                del model[min(model, key=lambda k: model[k][2])]
+            cache.put(key, tick)
+        else:
+            expected = None
+            if key in model:
+                (expires, value, _) = model[key]
+                if expires <= clock.now:
+                    del model[key]
+                else:
+                    model[key] = (expires, value, tick)
+                    expected = value
+            assert cache.get(key) == expected
+        assert set(cache.entries) == set(model)
@@ -0,0 +1,96 @@
+import random
+
+from cogs.pets.dataset import Dataset, PriorityIndex, set_bits
+from cogs.pets.types import Talent
+from tests.toy import toy_pets, toy_talents
+
+
+def talents(rng: random.Random, count: int) -> list[Talent]:
+    return [
+        Talent({
+            "name": f"Talent {i}",
+            "internal_name": f"Talent-{i:03}",
+            # plenty of ties so the stable order gets exercised too
+            "priority": rng.randrange(count // 3),
+            "absolute_priority": rng.randrange(count * 2),
+            "rarity": rng.randint(1, 5),
+            "unlocked": rng.choice([None, None, None, True, False]),
+        })
+        for i in range(count)
+    ]
+
+
+def test_priority_index_agrees_with_sorted():
+    rng = random.Random(0)
+    pool = talents(rng, 150)
+
+    for key in ("priority", "absolute_priority"):
+        index = PriorityIndex(pool, key)
+        ordered = sorted(pool, key=lambda t: getattr(t, key))
+        assert index.talents == ordered
+
+        for _ in range(500):
+            below = rng.choice([None, *pool])
+            above = rng.choice([None, *pool])
+            rarities = set(rng.sample(range(1, 6), rng.randint(0, 3)))
+            lockable = rng.random() < 0.5
+
+            low = None if below is None else getattr(below, key)
+            high = None if above is None else getattr(above, key)
+            expected = [
+                t for t in ordered
+                if t is below or t is above or (
+                    (low is None or getattr(t, key) >= low)
+                    and (high is None or getattr(t, key) <= high)
+                    and (not rarities or t.rarity in rarities)
+                    and (lockable or t.unlocked is None)
+                )
+            ]
+            assert index.between(below, above, rarities=rarities, lockable=lockable) == expected
+
+
+def test_priority_index_sort_agrees_with_sorted():
+    rng = random.Random(1)
+    pool = talents(rng, 100)
+    index = PriorityIndex(pool, "priority")
+    rank = {t.internal_name: i for i, t in enumerate(sorted(pool, key=lambda t: t.priority))}
+    for _ in range(100):
+        picked = rng.sample(pool, rng.randint(0, 20))
+        assert index.sort(picked) == sorted(picked, key=lambda t: rank[t.internal_name])
+
+
+def test_set_bits_agrees_with_a_bit_by_bit_walk():
+    rng = random.Random(2)
+    for size in (0, 1, 5, 64, 1000, 100_000):
+        for density in (0.0, 0.01, 0.5, 1.0):
+            bits = sum(1 << i for i in range(size) if rng.random() < density)
+            assert set_bits(bits) == [i for i in range(bits.bit_length()) if bits >> i & 1]
+
+
+def test_recommend_agrees_with_brute_force():
+    rng = random.Random(3)
+    ds = Dataset(toy_pets(rng, 150), toy_talents())  # type: ignore
+    ranks = ds.talents_by_priority.ranks
+    everything = list(ds.talents_by_internal_name.values())
+
+    for _ in range(300):
+        wishlist = {talent: float(rng.randint(1, 10)) for talent in rng.sample(everything, rng.randint(1, 5))}
+        # locked/unlocked variants count as the same talent
+        weights: dict[Talent, float] = {}
+        for talent, weight in wishlist.items():
+            talent = ds.talents_by_lowercase_name.get(talent.lower_name, talent)
+            weights[talent] = weights.get(talent, 0.0) + weight
+
+        ranked = []
+        for index, pet in enumerate(ds.pets):
+            matched = sorted((t for t in weights if t.lower_name in pet.pool), key=lambda t: ranks[t.internal_name])
+            if matched:
+                score = sum(weights[t] for t in matched)
+                ranked.append((-score, ranks[matched[0].internal_name], index, pet, matched))
+        ranked.sort(key=lambda entry: entry[:3])
+
+        limit = rng.randint(1, 40)
+        found = ds.recommend(wishlist, limit=limit)
+        assert [(score, pet) for score, pet, _ in found] == [(-score, pet) for score, _, _, pet, _ in ranked[:limit]]
+        for (_, _, matched), expected in zip(found, ranked):
+            assert [ds.talents_sorted_by_priority[rank] for rank in set_bits(matched)] == expected[4]
@@ -0,0 +1,35 @@
+import random
+
+from tests.toy import EGGS, SCHOOLS, SPELLS
+
+
+def test_resolve_agrees_with_a_list_filter(pets_cog):
+    ds = pets_cog.DATASET.current
+    rng = random.Random(0)
+    talents = list(ds.talents_by_internal_name.values())
+
+    for _ in range(500):
+        flags = pets_cog.PetSearchFlags.__new__(pets_cog.PetSearchFlags)
+        flags.wow_factor = rng.choice([None, None, rng.randint(1, 10)])
+        flags.rarity = rng.choice([None, None, rng.randint(1, 5)])
+        flags.school = rng.choice([None, None, rng.choice(SCHOOLS).lower()])
+        flags.egg = rng.choice([None, None, rng.choice(EGGS).lower()])
+        flags.exclusive = rng.choice([None, True, False])
+        flags.tradeable = rng.choice([None, True, False])
+        flags.hybrid = rng.choice([None, True, False])
+        flags.talent = rng.sample(talents, rng.choice([0, 0, 1, 2]))
+        flags.spell = [rng.choice(SPELLS)[:rng.randint(2, 6)] for _ in range(rng.choice([0, 0, 1]))]
+
+        expected = [
+            pet for pet in ds.pets
+            if (flags.wow_factor is None or pet.wow_factor == flags.wow_factor)
+            and (flags.rarity is None or pet.rarity == flags.rarity)
+            and (flags.school is None or pet.lower_school == flags.school)
+            and (flags.egg is None or pet.egg_key == flags.egg)
+            and (flags.exclusive is None or pet.exclusive == flags.exclusive)
+            and (flags.tradeable is None or pet.tradeable == flags.tradeable)
+            and (flags.hybrid is None or pet.hybrid == flags.hybrid)
+            and all(talent.lower_name in pet.pool for talent in flags.talent)
+            and all(any(spell.lower() in name for name in pet.lower_spells) for spell in flags.spell)
+        ]
+        assert ds.pets_from_bitset(flags.resolve(ds, ds.all_pets)) == expected
@@ -0,0 +1,39 @@
+import itertools
+import random
+
+from cogs.pets.manifest import ROLL_CHANCES, manifest_chances
+
+
+def brute_force(rarities: tuple[int, ...], level_ups: int) -> list[float]:
+    """every pass/fail combination of every roll on every level up."""
+
+    rolls = [ROLL_CHANCES[rarity] for rarity in rarities]
+    chances = [0.0] * len(rolls)
+
+    def level_up(manifested: frozenset[int], chance: float, left: int):
+        if not left:
+            for position in manifested:
+                chances[position] += chance
+            return
+        rolling = [position for position in range(len(rolls)) if position not in manifested]
+        for passed in itertools.product((False, True), repeat=len(rolling)):
+            outcome = chance
+            for position, won in zip(rolling, passed):
+                outcome *= rolls[position] if won else 1 - rolls[position]
+            # the lowest priority of the ones that passed wins
+            winners = [position for position, won in zip(rolling, passed) if won]
+            level_up(manifested | frozenset(winners[:1]), outcome, left - 1)
+
+    level_up(frozenset(), 1.0, level_ups)
+    return chances
+
+
+def test_manifest_chances_agree_with_brute_force():
+    rng = random.Random(0)
+    for _ in range(60):
+        size = rng.randint(1, 4)
+        level_ups = rng.randint(1, 5 if size <= 3 else 3)
+        rarities = tuple(rng.choice(list(ROLL_CHANCES)) for _ in range(size))
+        expected = brute_force(rarities, level_ups)
+        for got, want in zip(manifest_chances(rarities, level_ups), expected, strict=True):
+            assert abs(got - want) < 1e-9, rarities
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from core import metrics
+
+
+@pytest.fixture(autouse=True)
+def histograms(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(metrics, "HISTOGRAMS", {})
+    monkeypatch.setattr(metrics, "ENABLED", False)
+
+
+def parse(text: str) -> dict[str, float]:
+    values: dict[str, float] = {}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            (series, value) = line.rsplit(" ", 1)
+            values[series] = float(value)
+    return values
+
+
+def test_render():
+    for seconds in (0.00005, 0.0003, 0.0003, 7.0):
+        metrics.observe("convert", "PetConverter", seconds)
+    metrics.observe("send", 'a "quoted"\nname', 0.01)
+
+    text = metrics.render([("gobu_messages_total", "counter", 3)])
+    assert text.endswith("\n")
+    assert "# TYPE gobu_latency_seconds histogram" in text
+    assert "# TYPE gobu_messages_total counter\ngobu_messages_total 3\n" in text
+
+    values = parse(text)
+    labels = 'phase="convert",name="PetConverter"'
+    # cumulative, with 7s only in +Inf
+    assert values[f'gobu_latency_seconds_bucket{{{labels},le="0.0001"}}'] == 1
+    assert values[f'gobu_latency_seconds_bucket{{{labels},le="0.00025"}}'] == 1
+    assert values[f'gobu_latency_seconds_bucket{{{labels},le="0.0005"}}'] == 3
+    assert values[f'gobu_latency_seconds_bucket{{{labels},le="5.0"}}'] == 3
+    assert values[f'gobu_latency_seconds_bucket{{{labels},le="+Inf"}}'] == 4
+    assert values[f"gobu_latency_seconds_count{{{labels}}}"] == 4
+    assert values[f"gobu_latency_seconds_sum{{{labels}}}"] == pytest.approx(7.00065)
+
+    escaped = r'phase="send",name="a \"quoted\"\nname"'
+    assert values[f"gobu_latency_seconds_count{{{escaped}}}"] == 1
+
+
+def test_disabled_records_nothing():
+    calls = []
+
+    @metrics.timed("convert", "Converter")
+    async def convert(argument: str) -> str:
+        calls.append(argument)
+        return argument
+
+    with metrics.timer("render", "pets"):
+        pass
+    assert metrics.timer("render", "pets") is metrics.NO_TIMER
+    assert asyncio.run(convert("rain core")) == "rain core"
+    assert calls == ["rain core"]
+    assert metrics.HISTOGRAMS == {}
+    assert parse(metrics.render()) == {}
+
+    metrics.ENABLED = True
+    with metrics.timer("render", "pets"):
+        pass
+    assert asyncio.run(convert("ghulture")) == "ghulture"
+    assert set(metrics.HISTOGRAMS) == {("render", "pets"), ("convert", "Converter")}
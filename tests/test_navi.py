@@ -0,0 +1,33 @@
+import asyncio
+
+from discord import ui
+
+from core import navi
+
+
+def buttons(index: int, max_pages: int) -> list[ui.Button]:
+    async def build() -> navi.PersistentView:
+        return navi.PersistentView("talents", 1234, "below: x above: y", index, max_pages)
+
+    # views want a running loop
+    view = asyncio.run(build())
+    return [item for item in view.children if isinstance(item, ui.Button)]
+
+
+def test_custom_id_round_trip():
+    for index in (0, 1, 4):
+        pages = {"f": 0, "p": max(index - 1, 0), "i": index, "n": min(index + 1, 4), "l": 4, "x": index}
+        for button in buttons(index, 5):
+            assert button.custom_id is not None
+            (kind, owner_id, page, action, query) = navi.parse_custom_id(button.custom_id) or ()
+            assert (kind, owner_id, query) == ("talents", 1234, "below: x above: y")
+            assert page == pages[action]
+
+
+def test_bool_index_is_still_a_page():
+    # eg. `reversed and max_pages - 1` when not reversed
+    for button in buttons(False, 5):  # type: ignore
+        assert button.custom_id is not None
+        assert navi.parse_custom_id(button.custom_id) is not None
+
+    assert type(navi.proxy([1, 2, 3], index=False).index) is int  # type: ignore
@@ -0,0 +1,169 @@
+import asyncio
+import itertools
+import random
+
+import discord
+
+from cogs.pets import planner
+from cogs.pets.dataset import Dataset
+
+TALENTS = ["Pain-Giver", "Spell-Defying", "Mighty", "Healer", "Fairy Tale", "Sprite Friend"]
+
+
+def toy_dataset(rng: random.Random, size: int) -> Dataset:
+    talents = [
+        {
+            "name": name,
+            # the dataset special cases spell-defying's aliases by this name
+            "internal_name": "Talent-Resist-All01" if name == "Spell-Defying" else f"Talent-{i}",
+            "priority": i,
+            "absolute_priority": i,
+            "rarity": 1 + i % 5,
+            "unlocked": None,
+        }
+        for i, name in enumerate(TALENTS)
+    ]
+    pets = [
+        {
+            "name": f"Toy {i}",
+            "internal_name": f"Toy-{i}",
+            "wow_factor": rng.randint(1, 10),
+            "exclusive": False,
+            "rarity": 1,
+            "school": "Fire",
+            "school_only": False,
+            "egg": "Toy Egg",
+            "talents": rng.sample(TALENTS, rng.randint(0, 2)),
+            "abilities": [],
+            "tradeable": True,
+            "spells": [],
+            "morphing_exceptions": [],
+        }
+        for i in range(size)
+    ]
+    for pet in pets:
+        for _ in range(rng.choice((0, 0, 1))):
+            pet["morphing_exceptions"].append({
+                "other": rng.choice(pets)["internal_name"],
+                "baby": rng.choice(pets)["internal_name"],
+            })
+    return Dataset(pets, talents)  # type: ignore
+
+
+def exhaustive(ds: Dataset, targets: tuple[str, ...], goal: str | None, max_hatches: int
+) -> tuple[int, float] | None:
+    """(fewest hatches, best chance in %) over every start and partner."""
+
+    def carries(name: str) -> frozenset[str]:
+        return frozenset(targets) & ds.pets_by_internal_name[name].pool
+
+    names = [pet.internal_name for pet in ds.pets]
+    if goal is None:
+        for size in range(1, max_hatches + 2):
+            for picked in itertools.combinations(names, size):
+                if frozenset().union(*map(carries, picked)) == frozenset(targets):
+                    return (size - 1, 100.0)
+        return None
+
+    # every (body, carried) reachable in exactly n hatches -> best chance
+    layer = {(name, carries(name)): 1.0 for name in names}
+    for hatches in range(max_hatches + 1):
+        done = [chance for (body, carried), chance in layer.items()
+                if body == goal and carried == frozenset(targets)]
+        if done:
+            return (hatches, max(done) * 100)
+
+        following: dict[tuple[str, frozenset[str]], float] = {}
+        for (body, carried), chance in layer.items():
+            for partner in names:
+                outcomes = ds.hatch_outcomes(ds.pets_by_internal_name[body], ds.pets_by_internal_name[partner])
+                for baby, (_, baby_chance) in outcomes.items():
+                    state = (baby, carried | carries(partner))
+                    following[state] = max(following.get(state, 0.0), chance * baby_chance / 100)
+        layer = following
+    return None
+
+
+def replay(ds: Dataset, targets: tuple[str, ...], goal: str | None, plan: planner.Plan) -> float:
+    """checks plan does what it says, returns its chance in %."""
+
+    assert plan.start is not None
+    body = plan.start
+    carried = frozenset(targets) & ds.pets_by_internal_name[body].pool
+    chance = 100.0
+    for step in plan.steps:
+        carried |= frozenset(targets) & ds.pets_by_internal_name[step.partner].pool
+        if goal is not None:
+            assert step.baby is not None
+            outcomes = ds.hatch_outcomes(ds.pets_by_internal_name[body], ds.pets_by_internal_name[step.partner])
+            (_, step_chance) = outcomes[step.baby]
+            assert abs(step.chance - step_chance) < 0.01
+            chance *= step_chance / 100
+            body = step.baby
+
+    assert carried == frozenset(targets)
+    assert goal is None or body == goal
+    return chance
+
+
+def test_search_agrees_with_exhaustive():
+    rng = random.Random(0)
+    for _ in range(200):
+        ds = toy_dataset(rng, 7)
+        planner.init(ds, [0])
+
+        for _ in range(5):
+            targets = tuple(name.lower() for name in rng.sample(TALENTS, rng.randint(1, 4)))
+            goal = rng.choice([None, *(pet.internal_name for pet in ds.pets)])
+            plan = planner.search(targets, goal, slot=0, max_hatches=3, budget=10.0)
+            expected = exhaustive(ds, targets, goal, 3)
+
+            if expected is None:
+                assert plan.status == "exhausted"
+                continue
+            assert plan.status == "found"
+            (hatches, best) = expected
+            assert len(plan.steps) == hatches
+            chance = replay(ds, targets, goal, plan)
+            assert abs(plan.chance - chance) < 0.01
+            # see partners_for_goal for why this isnt always the best
+            assert plan.chance <= best + 0.01
+
+
+class Context:
+    """just what run_plan uses of a commands.Context."""
+
+    def __init__(self, ds: Dataset):
+        self.pets_dataset = ds
+        self.author = discord.Object(1)
+
+    async def send(self, content: str, **kwargs):
+        return content
+
+
+def test_plans_again_after_a_worker_dies(pets_cog):
+    async def run():
+        cog = pets_cog.PetsCog(None)
+        ds = pets_cog.DATASET.current
+        try:
+            (plan, _, _) = await cog.run_plan(Context(ds), ("mighty",), None)
+            assert plan.status == "found"
+
+            # eg. killed for running out of memory
+            pool = cog.planner
+            for process in list(pool._processes.values()):
+                process.kill()
+                process.join()
+
+            for _ in range(pets_cog.PLAN_SLOTS + 1):
+                (plan, _, _) = await cog.run_plan(Context(ds), ("mighty",), None)
+                assert plan.status == "found"
+            assert cog.planner is not pool
+        finally:
+            cog.stop_planner()
+
+        # every slot made it back
+        await asyncio.sleep(0)
+        assert sorted(cog.plan_slots) == list(range(pets_cog.PLAN_SLOTS))
+
+    asyncio.run(run())
@@ -0,0 +1,51 @@
+import random
+
+from core.ratelimit import CooldownStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_mixed_keys_with_the_same_expiry():
+    # a frozen clock gives every window the same end, so the heap can only
+    # order them by something other than the key
+    clock = Clock()
+    store: CooldownStore = CooldownStore(1, 10.0, maxsize=3, clock=clock)
+    for key in (1, "guild", (2, 3), None, frozenset()):
+        assert store.hit(key) == 0.0
+    assert len(store) == 3
+
+    clock.now = 10.0
+    store.purge()
+    assert len(store) == 0
+
+
+def test_agrees_with_brute_force():
+    rng = random.Random(0)
+    clock = Clock()
+    (rate, per) = (3, 5.0)
+    store: CooldownStore[int] = CooldownStore(rate, per, clock=clock)
+    # key -> (window ends at, uses left), never forgets anything
+    naive: dict[int, tuple[float, int]] = {}
+
+    for _ in range(5000):
+        clock.now += rng.choice((0.0, 0.0, 0.5, 1.0, 2.5))
+        key = rng.randrange(20)
+
+        (ends, left) = naive.get(key, (0.0, 0))
+        if ends <= clock.now:
+            naive[key] = (clock.now + per, rate - 1)
+            expected = 0.0
+        elif left <= 0:
+            expected = ends - clock.now
+        else:
+            naive[key] = (ends, left - 1)
+            expected = 0.0
+
+        assert store.hit(key) == expected
+        assert len(store) == sum(ends > clock.now for ends, _ in naive.values())
@@ -0,0 +1,111 @@
+import random
+
+from cogs.pets.search import (FuzzyIndex, PrefixIndex, TrigramIndex,
+                              edit_distance)
+
+
+def naive_distance(a: str, b: str) -> int:
+    # optimal string alignment, the whole table
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(
+                d[i - 1][j] + 1,
+                d[i][j - 1] + 1,
+                d[i - 1][j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+def typo(rng: random.Random, word: str, letters: str) -> str:
+    i = rng.randrange(len(word))
+    match rng.randrange(4):
+        case 0:
+            return word[:i] + word[i + 1 :]
+        case 1:
+            return word[:i] + rng.choice(letters) + word[i:]
+        case 2:
+            return word[:i] + rng.choice(letters) + word[i + 1 :]
+        case _:
+            i = min(i, len(word) - 2)
+            return word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+
+
+def test_trigram_index_agrees_with_a_scan():
+    rng = random.Random(2)
+    keys = ["".join(rng.choice("abc d") for _ in range(rng.randint(0, 12))) for _ in range(400)]
+    entries = {key: i for i, key in enumerate(keys)}
+    index = TrigramIndex(entries)
+
+    for length in range(0, 7):
+        for _ in range(200):
+            query = "".join(rng.choice("abc d") for _ in range(length))
+            assert index.search(query) == [value for key, value in entries.items() if query in key], query
+
+
+def test_prefix_index_agrees_with_a_scan():
+    rng = random.Random(3)
+    words = ["rain", "core", "ra", "co", "drake", "dr", "ghul"]
+    values = [object() for _ in range(60)]
+    # several keys per value, like the talent aliases
+    entries = {" ".join(rng.sample(words, rng.randint(1, 3))): rng.choice(values) for _ in range(200)}
+    scores = {id(value): rng.randint(0, 3) for value in values}
+    index = PrefixIndex(entries)
+
+    # every key and what's left of it after each space, alphabetical
+    suffixes = sorted(
+        ((" ".join(key.split(" ")[i:]), value) for key, value in entries.items() for i in range(key.count(" ") + 1)),
+        key=lambda suffix: suffix[0],
+    )
+    for _ in range(300):
+        prefix = rng.choice(words)[: rng.randint(0, 3)]
+        limit = rng.randint(1, 10)
+        accept = rng.choice([None, lambda value: scores[id(value)] != 1])
+
+        found = []
+        for suffix, value in suffixes:
+            if suffix.startswith(prefix) and all(value is not seen for seen in found):
+                if accept is None or accept(value):
+                    found.append(value)
+        assert index.complete(prefix, limit=limit, accept=accept) == found[:limit]
+
+        # stable, so equal scores stay alphabetical
+        ranked = sorted(found, key=lambda value: -scores[id(value)])
+        got = index.complete(prefix, limit=limit, accept=accept, score=lambda value: scores[id(value)])
+        assert got == ranked[:limit]
+
+
+def test_edit_distance_agrees_with_brute_force():
+    rng = random.Random(0)
+    for _ in range(3000):
+        a = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 9)))
+        b = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 9)))
+        bound = rng.randint(0, 4)
+        assert edit_distance(a, b, bound) == min(naive_distance(a, b), bound + 1), (a, b, bound)
+
+
+def test_closest_agrees_with_brute_force():
+    rng = random.Random(1)
+    syllables = ["ra", "in", "co", "re", "ghul", "ture", "wra", "ith", "dra", "ke", "myth", "go", "lem"]
+    keys = {
+        " ".join("".join(rng.sample(syllables, rng.randint(1, 3))) for _ in range(rng.randint(1, 2)))
+        for _ in range(300)
+    }
+    index = FuzzyIndex({key: key for key in keys})
+
+    for _ in range(250):
+        query = typo(rng, rng.choice(sorted(keys)), "abcdefghijklmnopqrstuvwxyz")
+        if rng.random() < 0.3:
+            query = typo(rng, query, "abcdefghijklmnopqrstuvwxyz")
+
+        close = [key for key in keys if naive_distance(query, key) <= 1]
+        expected = None
+        if len(query) >= 4 and len(close) == 1 and close[0] != query:
+            expected = close[0]
+        assert index.closest(query) == expected, query
@@ -0,0 +1,66 @@
+"""toy pets data for the tests, see conftest.pets_cog."""
+
+import random
+
+from cogs.pets.types import PetData, TalentData
+
+WORDS = ["Rain", "Core", "Ghulture", "Frost", "Eel", "Owl", "Dark", "Sprite", "Kraken", "Boar", "Pixie", "Dragon"]
+EGGS = ["Rain Core Egg", "Frost Egg", "Pixie Egg"]
+SPELLS = ["Death Blade", "Myth Blade", "Sprite Guard", "Frost Shield", "Rain Drake"]
+SCHOOLS = ["Fire", "Ice", "Storm", "Life", "Death", "Myth"]
+TALENTS = [
+    # (name, unlocked)
+    ("Pain-Giver", None),
+    # the dataset special cases spell-defying's aliases, see toy_talents
+    ("Spell-Defying", None),
+    ("No Pain, No Gain", None),
+    ("Mighty", None),
+    ("Healer", None),
+    ("Fairy Tale", None),
+    ("Frozen Kraken Trained", False),
+    ("Frozen Kraken Trained", True),
+    ("Sprite Friend", None),
+    ("Spell-Proof", None),
+]
+
+
+def toy_talents() -> list[TalentData]:
+    return [
+        {
+            "name": name,
+            "internal_name": "Talent-Resist-All01" if name == "Spell-Defying" else f"Talent-{i}",
+            "priority": (i * 7) % len(TALENTS),
+            "absolute_priority": i,
+            "rarity": 1 + i % 5,
+            "unlocked": unlocked,
+        }
+        for i, (name, unlocked) in enumerate(TALENTS)
+    ]
+
+
+def toy_pets(rng: random.Random, size: int) -> list[PetData]:
+    names = sorted({name for name, _ in TALENTS})
+    pets: list[PetData] = []
+    for i in range(size):
+        pets.append({
+            "name": f"{' '.join(rng.sample(WORDS, rng.randint(1, 2)))} {i}",
+            "internal_name": f"Pet-{i}",
+            "wow_factor": rng.randint(1, 10),
+            "exclusive": rng.random() < 0.2,
+            "rarity": rng.randint(1, 5),
+            "school": rng.choice(SCHOOLS),
+            "school_only": False,
+            "egg": rng.choice(EGGS),
+            "talents": rng.sample(names, rng.randint(0, 5)),
+            "abilities": rng.sample(names, rng.randint(0, 2)),
+            "tradeable": rng.random() < 0.7,
+            "spells": rng.sample(SPELLS, rng.randint(0, 2)),
+            "morphing_exceptions": [],
+        })
+    for pet in pets:
+        for _ in range(rng.choice((0, 0, 1))):
+            pet["morphing_exceptions"].append({
+                "other": rng.choice(pets)["internal_name"],
+                "baby": rng.choice(pets)["internal_name"],
+            })
+    return pets